@@ -0,0 +1,68 @@
+"""
+Atlas de poses pre-renderizadas.
+
+Un dibujo procedural que depende solo de unos pocos parámetros (la "pose",
+una tupla hashable) se renderiza una vez a una superficie y después se
+dibuja con un único blit. render(pose) -> (superficie, dx, dy, extra):
+(dx, dy) es el desplazamiento del sprite respecto al ancla del dibujo y
+extra son datos que el llamador vuelve a aplicar en cada frame (p. ej. los
+glows, que van al mapa de luz).
+
+bake() hornea por adelantado una lista de poses, opcionalmente repartida
+en un pool de procesos (los sprites vuelven como bytes RGBA).
+"""
+import pygame
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+ATLAS_MAX = 2048
+
+
+def _render_packed(render, pose):
+    s, dx, dy, extra = render(pose)
+    return pose, s.get_size(), pygame.image.tobytes(s, "RGBA"), dx, dy, extra
+
+
+class PoseAtlas:
+    def __init__(self, render, max_entries=ATLAS_MAX):
+        self.render = render
+        self.max_entries = max_entries
+        self._frames = OrderedDict()
+
+    def __len__(self):
+        return len(self._frames)
+
+    def __contains__(self, pose):
+        return pose in self._frames
+
+    def clear(self):
+        self._frames.clear()
+
+    def _store(self, pose, s, dx, dy, extra):
+        if pygame.display.get_surface() is not None:
+            s = s.convert_alpha()
+        entry = self._frames[pose] = (s, dx, dy, extra)
+        if len(self._frames) > self.max_entries:
+            self._frames.popitem(last=False)
+        return entry
+
+    def get(self, pose):
+        entry = self._frames.get(pose)
+        if entry is not None:
+            self._frames.move_to_end(pose)
+            return entry
+        return self._store(pose, *self.render(pose))
+
+    def bake(self, poses, workers=0):
+        """Renderiza las poses que aún no estén en el atlas. Devuelve cuántas."""
+        missing = [p for p in dict.fromkeys(poses) if p not in self._frames]
+        if workers > 1 and len(missing) > 1:
+            with ProcessPoolExecutor(workers) as pool:
+                for pose, size, raw, dx, dy, extra in pool.map(
+                        partial(_render_packed, self.render), missing, chunksize=32):
+                    self._store(pose, pygame.image.frombytes(raw, size, "RGBA"), dx, dy, extra)
+        else:
+            for pose in missing:
+                self._store(pose, *self.render(pose))
+        return len(missing)
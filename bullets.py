@@ -0,0 +1,107 @@
+"""
+Pool de proyectiles en arrays NumPy (structure-of-arrays).
+Sustituye a una lista de objetos Bullet: posición, velocidad, daño, color,
+dueño y flag de vida viven en arrays preasignados, y movimiento, descarte
+fuera del mundo e impacto con tiles se hacen en una pasada por lotes.
+"""
+import math
+import numpy as np
+
+OWNER_PLAYER = 0
+OWNER_ENEMY = 1
+_OWNERS = {"player": OWNER_PLAYER, "enemy": OWNER_ENEMY}
+
+# Límites verticales del mundo para descartar balas perdidas
+MIN_X = -50
+MIN_Y = -300
+MAX_Y = 2000
+
+
+class BulletPool:
+    def __init__(self, capacity=256):
+        self.n = 0
+        self._alloc(capacity)
+
+    def _alloc(self, capacity):
+        self.capacity = capacity
+        self.x     = np.zeros(capacity, dtype=np.float64)
+        self.y     = np.zeros(capacity, dtype=np.float64)
+        self.vx    = np.zeros(capacity, dtype=np.float64)
+        self.vy    = np.zeros(capacity, dtype=np.float64)
+        self.dmg   = np.zeros(capacity, dtype=np.int32)
+        self.col   = np.zeros((capacity, 3), dtype=np.uint8)
+        self.owner = np.zeros(capacity, dtype=np.int8)
+        self.alive = np.zeros(capacity, dtype=bool)
+
+    def _grow(self):
+        old = (self.x, self.y, self.vx, self.vy, self.dmg, self.col, self.owner, self.alive)
+        n = self.n
+        self._alloc(self.capacity * 2)
+        for dst, src in zip((self.x, self.y, self.vx, self.vy, self.dmg,
+                             self.col, self.owner, self.alive), old):
+            dst[:n] = src[:n]
+
+    def __len__(self):
+        return self.n
+
+    def clear(self):
+        self.n = 0
+
+    def spawn(self, x, y, dx, dy, dmg, col, speed, owner):
+        """Misma firma que el antiguo Bullet(...): (dx, dy) es la dirección."""
+        if self.n == self.capacity:
+            self._grow()
+        i = self.n
+        nrm = math.hypot(dx, dy) or 1
+        self.x[i], self.y[i] = x, y
+        self.vx[i], self.vy[i] = dx / nrm * speed, dy / nrm * speed
+        self.dmg[i] = dmg
+        self.col[i] = col
+        self.owner[i] = _OWNERS[owner]
+        self.alive[i] = True
+        self.n += 1
+
+    def update(self, tile_index, world_w):
+        """
+        Mueve todas las balas, descarta las que salen del mundo y las que
+        chocan con un tile. Devuelve los índices de las que chocaron con un
+        tile (para las chispas); siguen en el pool hasta compact().
+        """
+        n = self.n
+        if n == 0:
+            return np.empty(0, dtype=np.intp)
+        x, y = self.x[:n], self.y[:n]
+        x += self.vx[:n]
+        y += self.vy[:n]
+        alive = self.alive[:n]
+        alive &= (MIN_X < x) & (x < world_w) & (MIN_Y < y) & (y < MAX_Y)
+        live = np.flatnonzero(alive)
+        hit = live[tile_index.points_hit(x[live], y[live])]
+        alive[hit] = False
+        return hit
+
+    def live(self, owner):
+        """Índices de balas vivas de un dueño (OWNER_PLAYER / OWNER_ENEMY)."""
+        n = self.n
+        return np.flatnonzero(self.alive[:n] & (self.owner[:n] == owner))
+
+    def hits_rect(self, owner, r):
+        """Índices de balas vivas de `owner` dentro de r (semántica collidepoint)."""
+        n = self.n
+        xi = self.x[:n].astype(np.int64)
+        yi = self.y[:n].astype(np.int64)
+        inside = (r.left <= xi) & (xi < r.right) & (r.top <= yi) & (yi < r.bottom)
+        return np.flatnonzero(inside & self.alive[:n] & (self.owner[:n] == owner))
+
+    def compact(self):
+        """Elimina las balas muertas conservando el orden de las vivas."""
+        n = self.n
+        keep = self.alive[:n]
+        m = int(np.count_nonzero(keep))
+        if m == n:
+            return
+        for arr in (self.x, self.y, self.vx, self.vy, self.dmg, self.col, self.owner):
+            arr[:m] = arr[:n][keep]
+        self.alive[:m] = True
+        self.alive[m:n] = False
+        self.n = m
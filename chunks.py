@@ -0,0 +1,105 @@
+"""
+Caché de la geometría estática del nivel en chunks del mundo.
+
+El nivel no cambia durante la partida: los tiles se rasterizan una vez en
+superficies de CHUNK_SIZE x CHUNK_SIZE (coordenadas de mundo) con colorkey.
+Los chunks se generan al acercarse la cámara y se guardan en una LRU
+limitada por memoria (CHUNK_CACHE_BYTES); un frame dibuja solo unos pocos
+blits. Los chunks sin geometría no ocupan memoria ni se dibujan.
+"""
+import pygame
+from collections import OrderedDict
+
+CHUNK_SIZE = 512
+CHUNK_CACHE_BYTES = 64 * 1024 * 1024
+# Margen (px) alrededor del borde de pantalla en el que se adelanta la
+# generación de chunks, como máximo uno por frame
+PREFETCH_MARGIN = 256
+# Los tiles pueden pintar fuera de su rect (líneas de rejilla a la derecha,
+# borde inferior): se incluyen los que caen en este margen del chunk
+DRAW_OVERHANG = 32
+
+CHUNK_KEY = (255, 0, 255)
+
+
+class ChunkCache:
+    def __init__(self, tiles, tile_index, convert=True,
+                 chunk_size=CHUNK_SIZE, max_bytes=CHUNK_CACHE_BYTES):
+        """
+        tiles: objetos con render(surf, x, y) que dibujan el tile con su
+        esquina en (x, y); tile_index: TileIndex con los rects en el mismo
+        orden. convert=False en modo sin pantalla.
+        """
+        self.tiles = tiles
+        self.tile_index = tile_index
+        self.convert = convert
+        self.size = chunk_size
+        self.max_bytes = max_bytes
+        self._chunks = OrderedDict()   # (cx, cy) -> Surface o None (vacío)
+        self._bytes = 0
+
+    def __len__(self):
+        return len(self._chunks)
+
+    def clear(self):
+        self._chunks.clear()
+        self._bytes = 0
+
+    def _build(self, cx, cy):
+        cs = self.size
+        x0, y0 = cx * cs, cy * cs
+        m = DRAW_OVERHANG
+        idx = self.tile_index.query_indices(x0 - m, y0 - m, cs + m, cs + m)
+        if not idx:
+            return None
+        s = pygame.Surface((cs, cs))
+        if self.convert:
+            s = s.convert()
+        s.fill(CHUNK_KEY)
+        for i in idx:
+            r = self.tile_index.tiles[i]
+            self.tiles[i].render(s, r.x - x0, r.y - y0)
+        s.set_colorkey(CHUNK_KEY, pygame.RLEACCEL)
+        if s.get_bounding_rect().w == 0:
+            return None
+        return s
+
+    def _get(self, key):
+        chunks = self._chunks
+        if key in chunks:
+            chunks.move_to_end(key)
+            return chunks[key]
+        s = chunks[key] = self._build(*key)
+        if s is not None:
+            self._bytes += s.get_width() * s.get_height() * s.get_bytesize()
+            while self._bytes > self.max_bytes and len(chunks) > 1:
+                _, old = chunks.popitem(last=False)
+                if old is not None:
+                    self._bytes -= old.get_width() * old.get_height() * old.get_bytesize()
+        return s
+
+    def _range(self, ox, oy, w, h, margin=0):
+        cs = self.size
+        return (range((ox - margin) // cs, (ox + w + margin - 1) // cs + 1),
+                range((oy - margin) // cs, (oy + h + margin - 1) // cs + 1))
+
+    def draw(self, surf, ox, oy):
+        """Dibuja los chunks visibles con la cámara en (ox, oy) (enteros)."""
+        w, h = surf.get_size()
+        cs = self.size
+        xs, ys = self._range(ox, oy, w, h)
+        seq = []
+        for cy in ys:
+            for cx in xs:
+                s = self._get((cx, cy))
+                if s is not None:
+                    seq.append((s, (cx * cs - ox, cy * cs - oy)))
+        surf.blits(seq, doreturn=False)
+
+        # Adelantar un chunk del borde por frame
+        xs, ys = self._range(ox, oy, w, h, PREFETCH_MARGIN)
+        for cy in ys:
+            for cx in xs:
+                if (cx, cy) not in self._chunks:
+                    self._get((cx, cy))
+                    return
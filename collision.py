@@ -0,0 +1,187 @@
+"""
+Índice espacial estático de tiles (colisión con el nivel).
+Se construye una vez por nivel: grid uniforme (cx, cy) -> índices de tiles.
+Lo comparten el sensado de paredes del jugador, la resolución por ejes de
+jugador y enemigos, la sonda de bordes y el impacto de balas.
+"""
+import numpy as np
+import pygame
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Tamaño de celda del grid (px)
+CELL_SIZE = 128
+
+
+class TileIndex:
+    __slots__ = ("tiles", "cell_size", "_cells", "_dense")
+
+    def __init__(self, tiles: Sequence[pygame.Rect], cell_size: int = CELL_SIZE):
+        self.tiles = list(tiles)
+        self.cell_size = cell_size
+        # Cada celda guarda índices en orden creciente: las consultas devuelven
+        # los tiles en el mismo orden que la lista original, igual que el
+        # recorrido lineal que reemplazan.
+        self._cells: Dict[Tuple[int, int], List[int]] = {}
+        for i, t in enumerate(self.tiles):
+            for cx in range(t.left // cell_size, t.right // cell_size + 1):
+                for cy in range(t.top // cell_size, t.bottom // cell_size + 1):
+                    self._cells.setdefault((cx, cy), []).append(i)
+        self._dense = None
+
+    def __len__(self):
+        return len(self.tiles)
+
+    def query_indices(self, x: float, y: float, w: float, h: float) -> List[int]:
+        """Índices de los tiles candidatos a solapar (x, y, w, h), en orden creciente."""
+        cs = self.cell_size
+        x0, x1 = int(x) // cs, int(x + w) // cs
+        y0, y1 = int(y) // cs, int(y + h) // cs
+        cells = self._cells
+        if x0 == x1 and y0 == y1:
+            return cells.get((x0, y0), [])
+        found = set()
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                idx = cells.get((cx, cy))
+                if idx:
+                    found.update(idx)
+        return sorted(found)
+
+    def query(self, x: float, y: float, w: float, h: float) -> List[pygame.Rect]:
+        """Tiles candidatos a solapar el rectángulo (x, y, w, h), en orden de nivel."""
+        tiles = self.tiles
+        return [tiles[i] for i in self.query_indices(x, y, w, h)]
+
+    def query_rect(self, r: pygame.Rect) -> List[pygame.Rect]:
+        return self.query(r.x, r.y, r.w, r.h)
+
+    def tile_at(self, x: float, y: float) -> Optional[pygame.Rect]:
+        """Primer tile que contiene el punto (x, y), o None."""
+        cs = self.cell_size
+        for i in self._cells.get((int(x) // cs, int(y) // cs), ()):
+            t = self.tiles[i]
+            if t.collidepoint(x, y):
+                return t
+        return None
+
+    def _build_dense(self):
+        """
+        Versión en arrays del grid para consultas por lotes: tabla
+        celda -> índices de tile (rellena con -1) y bordes de cada tile.
+        El índice -1 apunta a un tile centinela vacío.
+        """
+        cells = self._cells
+        if not cells:
+            return None
+        cx0 = min(k[0] for k in cells)
+        cy0 = min(k[1] for k in cells)
+        ncx = max(k[0] for k in cells) - cx0 + 1
+        ncy = max(k[1] for k in cells) - cy0 + 1
+        depth = max(len(v) for v in cells.values())
+        table = np.full((ncx * ncy, depth), -1, dtype=np.int32)
+        for (cx, cy), idx in cells.items():
+            table[(cx - cx0) * ncy + (cy - cy0), :len(idx)] = idx
+        n = len(self.tiles)
+        edges = np.empty((4, n + 1), dtype=np.int64)
+        for i, t in enumerate(self.tiles):
+            edges[:, i] = (t.left, t.top, t.right, t.bottom)
+        edges[:, n] = (1, 1, 0, 0)
+        return cx0, cy0, ncx, ncy, table, edges
+
+    def points_hit(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """
+        Vectorizado de tile_at(x, y) is not None para muchos puntos.
+        Misma semántica que Rect.collidepoint (coordenadas truncadas a int).
+        """
+        if self._dense is None:
+            self._dense = self._build_dense()
+        if self._dense is None or len(xs) == 0:
+            return np.zeros(len(xs), dtype=bool)
+        cx0, cy0, ncx, ncy, table, edges = self._dense
+        cs = self.cell_size
+        xi = xs.astype(np.int64)
+        yi = ys.astype(np.int64)
+        cx = xi // cs - cx0
+        cy = yi // cs - cy0
+        inside = (cx >= 0) & (cx < ncx) & (cy >= 0) & (cy < ncy)
+        cand = table[np.where(inside, cx * ncy + cy, 0)]
+        cand[~inside] = -1
+        xi = xi[:, None]
+        yi = yi[:, None]
+        hit = ((edges[0][cand] <= xi) & (xi < edges[2][cand]) &
+               (edges[1][cand] <= yi) & (yi < edges[3][cand]))
+        return hit.any(axis=1)
+
+
+class SpatialHash:
+    """
+    Broadphase dinámico: grid uniforme de entidades (enemigos, items...).
+    Se reconstruye cada frame con clear()+insert() o se mantiene de forma
+    incremental con insert()/remove(). Las consultas devuelven candidatos en
+    orden de inserción; la prueba exacta (rect/punto) la hace quien consulta.
+    """
+    __slots__ = ("cell_size", "_cells", "_where", "_order")
+
+    def __init__(self, cell_size: int = CELL_SIZE):
+        self.cell_size = cell_size
+        self._cells: Dict[Tuple[int, int], list] = {}
+        self._where: Dict[int, Tuple[Tuple[int, object], list]] = {}
+        self._order = 0
+
+    def __len__(self):
+        return len(self._where)
+
+    def clear(self) -> None:
+        self._cells.clear()
+        self._where.clear()
+        self._order = 0
+
+    def insert(self, obj, x: float, y: float, w: float, h: float) -> None:
+        cs = self.cell_size
+        entry = (self._order, obj)
+        self._order += 1
+        keys = []
+        cells = self._cells
+        for cx in range(int(x) // cs, int(x + w) // cs + 1):
+            for cy in range(int(y) // cs, int(y + h) // cs + 1):
+                key = (cx, cy)
+                bucket = cells.get(key)
+                if bucket is None:
+                    cells[key] = [entry]
+                else:
+                    bucket.append(entry)
+                keys.append(key)
+        self._where[id(obj)] = (entry, keys)
+
+    def remove(self, obj) -> None:
+        found = self._where.pop(id(obj), None)
+        if found is None:
+            return
+        entry, keys = found
+        for key in keys:
+            bucket = self._cells[key]
+            bucket.remove(entry)
+            if not bucket:
+                del self._cells[key]
+
+    def query(self, x: float, y: float, w: float, h: float) -> list:
+        """Entidades cuyas celdas tocan el rectángulo (x, y, w, h)."""
+        cs = self.cell_size
+        x0, x1 = int(x) // cs, int(x + w) // cs
+        y0, y1 = int(y) // cs, int(y + h) // cs
+        cells = self._cells
+        if x0 == x1 and y0 == y1:
+            return [obj for _, obj in cells.get((x0, y0), ())]
+        found = {}
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                for order, obj in cells.get((cx, cy), ()):
+                    found[order] = obj
+        return [found[k] for k in sorted(found)]
+
+    def query_rect(self, r: pygame.Rect) -> list:
+        return self.query(r.x, r.y, r.w, r.h)
+
+    def query_point(self, x: float, y: float) -> list:
+        cs = self.cell_size
+        return [obj for _, obj in self._cells.get((int(x) // cs, int(y) // cs), ())]
@@ -0,0 +1,33 @@
+"""Carga la configuración del juego desde data/settings.json."""
+import json
+import os
+
+# Valores por defecto de las claves que lee el juego
+DEFAULTS = {
+    # Resolución interna fija [ancho, alto]; null = resolución nativa
+    "render_resolution": None,
+    # Filtro del escalado a pantalla: "nearest" o "smooth"
+    "render_filter": "smooth",
+    # "software" o "sdl2": dibujo con blits de Surface o con texturas y el
+    # Renderer de SDL2 (ver sdl2_render.py)
+    "render_backend": "software",
+    # Tope de FPS al jugar (0 = sin límite); la simulación va siempre a 60 Hz
+    "max_fps": 60,
+}
+
+_loaded = None
+
+def get_settings():
+    global _loaded
+    if _loaded is not None:
+        return _loaded
+    _loaded = dict(DEFAULTS)
+    path = os.path.join(os.path.dirname(__file__), "settings.json")
+    if not os.path.isfile(path):
+        return _loaded
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            _loaded.update(json.load(f))
+        return _loaded
+    except (json.JSONDecodeError, IOError):
+        return _loaded
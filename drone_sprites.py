@@ -17,6 +17,8 @@ import os
 import sys
 import math
 
+import sdl2_render
+
 def _resource_base():
     if getattr(sys, "frozen", False):
         return sys._MEIPASS
@@ -57,9 +59,16 @@ _LASER_RECTS = [
 RENDER_W = 90
 RENDER_H = 62
 
+# ── Tintes ───────────────────────────────────────────────────────────────────
+# Flags combinables para get_frame(); cada variante se precalcula en init()
+TINT_NONE   = 0
+TINT_HURT   = 1   # rojo al recibir daño
+TINT_SLOWED = 2   # púrpura con la descarga neural
+_TINT_ADD = ((TINT_HURT, (200, 0, 0, 0)), (TINT_SLOWED, (70, 0, 140, 0)))
+
 # ── Estado interno ────────────────────────────────────────────────────────────
 _sheet:     pygame.Surface | None = None
-_fly:       list = []   # [(frame_right, frame_left), …]
+_fly:       list = []   # [[(frame_right, frame_left) por tinte], …]
 _shoot:     list = []
 _laser:     list = []
 _ready:     bool = False
@@ -79,8 +88,27 @@ def _crop(x: int, y: int, w: int, h: int) -> pygame.Surface:
     return pygame.transform.smoothscale(crop, (RENDER_W, RENDER_H))
 
 
+def _tinted(frame: pygame.Surface, tint: int) -> pygame.Surface:
+    """Copia del frame con los tintes de `tint` sumados (primero herido, luego ralentizado)."""
+    frame = frame.copy()
+    for flag, add in _TINT_ADD:
+        if tint & flag:
+            frame.fill(add, special_flags=pygame.BLEND_RGB_ADD)
+    return frame
+
+
+def _pair(right: pygame.Surface) -> tuple:
+    """(derecha, izquierda); el volteo queda registrado para el backend SDL2."""
+    return right, sdl2_render.mirror(pygame.transform.flip(right, True, False), right)
+
+
 def _build(rects: list) -> list:
-    return [(_crop(*r), pygame.transform.flip(_crop(*r), True, False)) for r in rects]
+    frames = []
+    for r in rects:
+        right = _crop(*r)
+        frames.append([_pair(right)] + [_pair(_tinted(right, t))
+                                        for t in (TINT_HURT, TINT_SLOWED, TINT_HURT | TINT_SLOWED)])
+    return frames
 
 
 def init() -> None:
@@ -110,10 +138,12 @@ def init() -> None:
 
 
 # ── API pública ───────────────────────────────────────────────────────────────
-def get_frame(anim_t: int, attack_t: int, at_cd: int, facing: int) -> pygame.Surface | None:
+def get_frame(anim_t: int, attack_t: int, at_cd: int, facing: int,
+              tint: int = TINT_NONE) -> pygame.Surface | None:
     """
     Devuelve el Surface correcto según el estado del drone.
     Retorna None si los sprites no están disponibles.
+    El Surface es compartido: no modificarlo.
 
     Lógica de animación:
       · Si attack_t > at_cd * 0.6  → LASER  (disparo activo, láser extendido)
@@ -121,6 +151,7 @@ def get_frame(anim_t: int, attack_t: int, at_cd: int, facing: int) -> pygame.Sur
       · En cualquier otro caso      → FLY    (movimiento normal)
 
     facing: 1 = mira derecha, -1 = mira izquierda
+    tint:   combinación de TINT_HURT | TINT_SLOWED (variantes precalculadas)
     """
     if not _ready:
         return None
@@ -142,4 +173,4 @@ def get_frame(anim_t: int, attack_t: int, at_cd: int, facing: int) -> pygame.Sur
         return None
 
     idx = (anim_t // tpf) % len(frames)
-    return frames[idx][side]
\ No newline at end of file
+    return frames[idx][tint][side]
\ No newline at end of file
@@ -19,20 +19,43 @@ shake_x = 0.0
 shake_y = 0.0
 shake_strength = 0.0
 
+# Números de daño: pool de capacidad fija; al llenarse se reutiliza el más
+# viejo. Golpes seguidos al mismo objetivo (separados menos de
+# DAMAGE_MERGE_WINDOW frames desde el último golpe) se suman en un solo
+# número. La pistola dispara cada 14 frames + 2 de hitstop por impacto: la
+# ventana cubre el fuego continuo con margen.
+DAMAGE_POOL_SIZE = 48
+DAMAGE_MERGE_WINDOW = 30
+DAMAGE_TEXT_CACHE_MAX = 256
+
 # Números de daño flotantes
 class DamageNumber:
-    __slots__ = ("x", "y", "text", "life", "max_life", "vy", "col")
-    def __init__(self, x, y, value, col=(255, 55, 55)):
+    __slots__ = ("x", "y", "value", "text", "life", "max_life", "vy", "col", "target", "age")
+    def __init__(self):
+        self.life = 0
+        self.target = None
+
+    def reset(self, x, y, value, col=(255, 55, 55), target=None):
         self.x, self.y = float(x), float(y)
-        self.text = str(int(value))
+        self.value = int(value)
+        self.text = str(self.value)
         self.life = self.max_life = 45
         self.vy = -1.8
         self.col = col
+        self.target = target
+        self.age = 0
+
+    def add(self, x, y, value):
+        """Suma otro golpe: acumula el valor y vuelve a lanzar el número."""
+        self.reset(x, y, self.value + int(value), self.col, self.target)
 
     def update(self):
         self.life -= 1
+        self.age += 1
         self.y += self.vy
         self.vy *= 0.92
+        if self.life <= 0:
+            self.target = None
 
     def draw(self, surf, ox, oy, font):
         if self.life <= 0:
@@ -43,14 +66,15 @@ class DamageNumber:
         alpha = int(255 * ratio)
         if alpha <= 0:
             return self.life <= 0
-        txt_surf = font.render(self.text, True, self.col)
+        txt_surf = _damage_text(font, self.text, self.col)
         txt_surf.set_alpha(alpha)
         surf.blit(txt_surf, (sx - txt_surf.get_width()//2, sy - txt_surf.get_height()//2))
         return True
 
 
-damage_numbers = []
+damage_numbers = [DamageNumber() for _ in range(DAMAGE_POOL_SIZE)]
 _damage_font = None
+_damage_texts = {}   # (texto, color) -> superficie; el alpha se ajusta al dibujar
 
 def get_damage_font():
     global _damage_font
@@ -62,6 +86,15 @@ def get_damage_font():
     return _damage_font
 
 
+def _damage_text(font, text, col):
+    s = _damage_texts.get((text, col))
+    if s is None:
+        if len(_damage_texts) >= DAMAGE_TEXT_CACHE_MAX:
+            _damage_texts.clear()
+        s = _damage_texts[(text, col)] = font.render(text, True, col)
+    return s
+
+
 def trigger_hitstop(frames=None, is_slash=True):
     """Activa hitstop (pausa breve al acertar)."""
     global hitstop_remaining
@@ -81,9 +114,18 @@ def trigger_shake(strength=None, is_slash=True, is_melee_hit=False):
     shake_strength = max(shake_strength, s)
 
 
-def spawn_damage_number(x, y, value, col=(255, 55, 55)):
-    """Añade un número de daño flotante (opcional)."""
-    damage_numbers.append(DamageNumber(x, y, value, col))
+def spawn_damage_number(x, y, value, col=(255, 55, 55), target=None):
+    """
+    Añade un número de daño flotante. Con `target` (p. ej. el enemigo
+    golpeado), los golpes seguidos del mismo color se acumulan en uno.
+    """
+    if target is not None:
+        for d in damage_numbers:
+            if d.target is target and d.life > 0 and d.col == col and d.age < DAMAGE_MERGE_WINDOW:
+                d.add(x, y, value)
+                return
+    slot = min(damage_numbers, key=lambda d: d.life)   # libre o el más viejo
+    slot.reset(x, y, value, col, target)
 
 
 def update_effects():
@@ -99,10 +141,9 @@ def update_effects():
     else:
         shake_x = shake_y = 0.0
         shake_strength = 0.0
-    for i in range(len(damage_numbers) - 1, -1, -1):
-        damage_numbers[i].update()
-        if damage_numbers[i].life <= 0:
-            damage_numbers.pop(i)
+    for d in damage_numbers:
+        if d.life > 0:
+            d.update()
 
 
 def get_camera_offset():
@@ -118,7 +159,12 @@ def is_hitstop_active():
 def draw_damage_numbers(surf, ox, oy):
     """Dibuja todos los números de daño."""
     font = get_damage_font()
-    for d in damage_numbers[:]:
-        if not d.draw(surf, ox, oy, font) or d.life <= 0:
-            if d in damage_numbers:
-                damage_numbers.remove(d)
+    for d in damage_numbers:
+        if d.life > 0:
+            d.draw(surf, ox, oy, font)
+
+
+def clear_damage_numbers():
+    for d in damage_numbers:
+        d.life = 0
+        d.target = None
@@ -0,0 +1,144 @@
+"""
+Glows y mapa de luz.
+
+glow_sprite(): sprites de glow cacheados por (color, radio, alpha, estilo)
+en una LRU acotada.
+
+LightMap: durante un frame los glows (enemigos, items, balas, aura neural,
+jefe...) se encolan y se acumulan en un buffer a 1/LIGHTMAP_SCALE de
+resolución; al final se escala y se suma al frame con un único blit aditivo.
+LIGHTMAP_SCALE es el mando de calidad: 1 = resolución completa, 4 = un
+cuarto (por defecto). Con enabled=False los glows se dibujan directamente.
+Sobre un canvas del backend SDL2 (sdl2_render.py) cada luz reducida se
+dibuja escalada con blend ADD en el renderer.
+"""
+import pygame
+from collections import OrderedDict
+
+LIGHTMAP_SCALE = 4
+
+# Glows cacheados: un sprite por (color, radio, alpha, estilo), con LRU acotada.
+GLOW_CACHE_MAX = 256
+_glow_cache = OrderedDict()
+
+
+def _render_glow(color, radius, alpha, style):
+    s = pygame.Surface((radius * 4, radius * 4), pygame.SRCALPHA)
+    r, g, b = color
+    if style == "buble":
+        # Rellena el centro completamente transparente
+        # y dibuja el borde degradado de afuera hacia adentro
+        num_rings = 12
+        for i in range(num_rings):
+            ratio = i / num_rings          # 0 = exterior, 1 = interior
+            rad = max(1, int(radius * (1 - ratio * 0.35)))
+            a = int(alpha * (1 - ratio))   # alfa va de 'alpha' a 0
+            pygame.draw.circle(s, (r, g, b, a),
+                               (radius * 2, radius * 2),
+                               rad, max(2, radius // num_rings))
+        return s
+
+    # "circle" (y "soft", que es el mismo dibujo premultiplicado)
+    for i in range(3):
+        a   = alpha // (i + 1)
+        rad = radius + i * 4
+        pygame.draw.circle(s, (r, g, b, a), (radius * 2, radius * 2), rad)
+    return s
+
+
+def _cached(key, build):
+    s = _glow_cache.get(key)
+    if s is not None:
+        _glow_cache.move_to_end(key)
+        return s
+    s = _glow_cache[key] = build()
+    if len(_glow_cache) > GLOW_CACHE_MAX:
+        _glow_cache.popitem(last=False)
+    return s
+
+
+def glow_sprite(color, radius, alpha, style="circle"):
+    key = (tuple(color), radius, alpha, style)
+    return _cached(key, lambda: _render_glow(key[0], radius, alpha, style))
+
+
+def light_sprite(color, radius, alpha, style, scale):
+    """
+    Versión del glow para el mapa de luz, reducida a 1/scale. "circle" ya es
+    aditivo; "buble" y "soft" se premultiplican para que sumar equivalga a
+    mezclar por alpha sobre fondo oscuro.
+    """
+    key = (tuple(color), radius, alpha, style, scale)
+
+    def build():
+        s = glow_sprite(key[0], radius, alpha, "buble" if style == "buble" else "circle")
+        if style != "circle":
+            s = s.premul_alpha()
+        if scale > 1:
+            size = max(1, round(s.get_width() / scale))
+            s = pygame.transform.smoothscale(s, (size, size))
+        return s
+
+    return _cached(key, build)
+
+
+class LightMap:
+    def __init__(self, scale=LIGHTMAP_SCALE, enabled=True):
+        self.scale = scale
+        self.enabled = enabled
+        self.target = None   # superficie del frame abierto (begin/composite)
+        self._queue = []
+        self._buf = None
+        self._size = (0, 0)
+
+    def _ensure_buffer(self, w, h):
+        if self._size != (w, h):
+            s = self.scale
+            self._buf = pygame.Surface(((w + s - 1) // s, (h + s - 1) // s))
+            self._buf.fill((0, 0, 0))
+            self._size = (w, h)
+
+    def begin(self, surf):
+        """Abre un frame: a partir de aquí los glows sobre `surf` se encolan."""
+        self._queue.clear()
+        self.target = surf if self.enabled else None
+
+    def add(self, color, cx, cy, radius, alpha, style="circle"):
+        self._queue.append((color, int(cx), int(cy), radius, alpha, style))
+
+    def composite(self):
+        """Acumula la cola en el buffer reducido y lo suma al frame en un blit."""
+        surf, self.target = self.target, None
+        if surf is None or not self._queue:
+            self._queue.clear()
+            return
+        s = self.scale
+        seq = []
+        for color, cx, cy, radius, alpha, style in self._queue:
+            spr = light_sprite(color, radius, alpha, style, s)
+            half = spr.get_width() // 2
+            seq.append((spr, (cx // s - half, cy // s - half)))
+        self._queue.clear()
+
+        if not isinstance(surf, pygame.Surface):
+            # Canvas del backend SDL2: cada luz reducida se escala en el
+            # renderer y se suma con blend ADD, sin buffer en la CPU
+            for spr, (x, y) in seq:
+                w, h = spr.get_size()
+                surf.blit_scaled(spr, (x * s, y * s, w * s, h * s), pygame.BLEND_RGB_ADD)
+            return
+
+        self._ensure_buffer(*surf.get_size())
+        buf = self._buf
+        dirty = buf.get_rect().clip(
+            pygame.Rect(seq[0][1], seq[0][0].get_size()).unionall(
+                [pygame.Rect(pos, spr.get_size()) for spr, pos in seq[1:]]))
+        if dirty.w <= 0 or dirty.h <= 0:
+            return
+        buf.blits([(spr, pos, None, pygame.BLEND_RGB_ADD) for spr, pos in seq], doreturn=False)
+
+        region = buf.subsurface(dirty)
+        if s > 1:
+            region = pygame.transform.smoothscale(region, (dirty.w * s, dirty.h * s))
+        surf.blit(region, (dirty.x * s, dirty.y * s), special_flags=pygame.BLEND_RGB_ADD)
+        buf.fill((0, 0, 0), dirty)
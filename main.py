@@ -5,6 +5,7 @@
 ║                                                          ║
 ║   Instalar: pip install pygame                           ║
 ║   Ejecutar: python neurocalipsis.py                      ║
+║   Simular:  python -m neurocalipsis simulate --frames N  ║
 ║                                                          ║
 ║   CONTROLES:                                             ║
 ║   A / D         → Mover                                 ║
@@ -20,32 +21,63 @@
 """
 
 import pygame
+import numpy as np
 import sys
 import math
 import random
+import operator
 import json
 import os
+import time
+from contextlib import contextmanager
 
 import effects
 from particles import ParticleSystem
 import abilities as ab
 import minimap as mm
+import text_cache as tc
+from collision import TileIndex, SpatialHash
+from bullets import BulletPool, OWNER_PLAYER, OWNER_ENEMY
+from lighting import LightMap, glow_sprite
+from chunks import ChunkCache
+from atlas import PoseAtlas
+from overlays import OverlayCompositor
+import sdl2_render
 from data.load_stats import get_enemy_stats
+from data.load_settings import get_settings
 import drone_sprites  # ← sprites del drone
 
-pygame.init()
-pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
-
 DEBUG = False  # F1 para toggle
-TILE_CELL = 128  # celdas para grid de colisión de balas
-pygame.display.set_caption("NEUROCALIPSIS: El Último Fragmento")
+HEADLESS = False  # True en modo simulación: sin ventana, sin audio, sin blits
 
 # ─────────────────────────────────────────────────────────
 # CONSTANTES GLOBALES
 # ─────────────────────────────────────────────────────────
-FPS  = 60
+FPS  = 60        # pasos de simulación por segundo (paso fijo)
+STEP_MS = 1000 / FPS
+MAX_SIM_STEPS = 5   # pasos como máximo por frame; tras un parón se descarta el resto
+IDLE_FPS  = 30   # pausa, muerte y victoria (mundo congelado)
+TITLE_FPS = 20   # pantalla de título
+FROZEN_STATES = ("pause", "dead", "win")
 GRAV = 0.58
 FALL_DEATH_Y = 2000  # Si el jugador cae por debajo de esta Y, muere
+MINIMAP_WORLD_H = 800  # Alto del mundo que cubre el minimapa
+# LOD de simulación. Cada región es la unión de un rect centrado en el
+# jugador y la vista de la cámara ampliada (la cámara se queda fija en los
+# bordes del nivel y entonces la pantalla llega más allá del jugador):
+# - región completa (jugador ± SIM_FULL_HALF_*, vista ± SIM_SLEEP_SLACK):
+#   cada paso
+# - región activa (jugador ± SIM_ACTIVE_HALF_*, vista ± 2*SIM_SLEEP_SLACK):
+#   uno de cada SIM_LOD_STRIDE pasos (escalonado por enemigo)
+# - fuera: duermen en una grid; vuelven a dormir al alejarse SIM_SLEEP_SLACK
+#   más allá de la región activa (histéresis)
+SIM_FULL_HALF_W   = 1100
+SIM_FULL_HALF_H   = 700
+SIM_ACTIVE_HALF_W = 1800
+SIM_ACTIVE_HALF_H = 1000
+SIM_SLEEP_SLACK   = 300
+SIM_LOD_STRIDE    = 4
+SIM_LOD_CELL      = 512
 
 # Paleta cyberpunk
 BG1      = (4,   4,  14)
@@ -61,14 +93,22 @@ DARKBLUE = (10,  20,  40)
 GREY     = (80,  90, 110)
 DKGREY   = (20,  25,  35)
 
-# Pantalla completa (resolución nativa del monitor)
-screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
-W, H = screen.get_size()
+# Pantalla: se crea en init(). En modo headless W/H son solo la "vista" lógica
+# que usa la cámara, no hay superficie.
+# Con "render_resolution" en data/settings.json, `screen` es una superficie
+# interna de esa resolución fija (W, H) y present() la escala a `display`
+# una vez por frame; si no, `screen` es la propia ventana.
+# Con "render_backend": "sdl2", `screen` es un RendererCanvas
+# (sdl2_render.py): los sprites se suben una vez como texturas y se dibujan
+# con copias del Renderer de SDL2; `display` queda como ventana oculta para
+# convert()/convert_alpha().
+HEADLESS_W, HEADLESS_H = 1920, 1080
+screen  = None
+display = None
+backend = None   # sdl2_render.SDL2Backend o None (software)
+W, H = HEADLESS_W, HEADLESS_H
 clock  = pygame.time.Clock()
 
-# Inicializar sprites del drone (después de set_mode para que convert_alpha funcione)
-drone_sprites.init()
-
 # ─────────────────────────────────────────────────────────
 # CARGAR SONIDOS
 # ─────────────────────────────────────────────────────────
@@ -80,107 +120,112 @@ def _resource_base():
 
 BASE_DIR = _resource_base()
 
-print(f"📁 Directorio actual: {BASE_DIR}")
-print(f"🔊 Buscando sonido en: {os.path.join(BASE_DIR, 'sounds', 'slash.wav')}")
-print(f"🔊 ¿Existe el archivo? {os.path.exists(os.path.join(BASE_DIR, 'sounds', 'slash.wav'))}")
-
-try:
-    SND_SLASH = pygame.mixer.Sound(os.path.join(BASE_DIR, "sounds", "slash.wav"))
-    SND_SLASH.set_volume(0.6)
-    print("✅ Sonido de espada cargado correctamente")
-except FileNotFoundError:
-    print("⚠️ No se encontró el archivo de sonido: sounds/slash.wav")
-    SND_SLASH = None
-except Exception as e:
-    print(f"⚠️ Error al cargar el sonido: {e}")
-    SND_SLASH = None
-
-# Cargar sonido de descarga neural (tecla L)
-print(f"🔊 Buscando sonido de descarga en: {os.path.join(BASE_DIR, 'sounds', 'neural.wav')}")
-print(f"🔊 ¿Existe el archivo de descarga? {os.path.exists(os.path.join(BASE_DIR, 'sounds', 'neural.wav'))}")
-
-try:
-    SND_NEURAL = pygame.mixer.Sound(os.path.join(BASE_DIR, "sounds", "neural.wav"))
-    SND_NEURAL.set_volume(0.8)
-    print("✅ Sonido de descarga neural cargado correctamente")
-except FileNotFoundError:
-    print("⚠️ No se encontró el archivo de sonido: sounds/neural.wav")
-    SND_NEURAL = None
-except Exception as e:
-    print(f"⚠️ Error al cargar el sonido de descarga: {e}")
-    SND_NEURAL = None
-
-# Cargar sonido de pistola (tecla K)
-print(f"🔊 Buscando sonido de pistola en: {os.path.join(BASE_DIR, 'sounds', 'shoot.wav')}")
-print(f"🔊 ¿Existe el archivo de pistola? {os.path.exists(os.path.join(BASE_DIR, 'sounds', 'shoot.wav'))}")
-
-try:
-    SND_SHOOT = pygame.mixer.Sound(os.path.join(BASE_DIR, "sounds", "shoot.wav"))
-    SND_SHOOT.set_volume(0.5)
-    print("✅ Sonido de pistola cargado correctamente")
-except FileNotFoundError:
-    print("⚠️ No se encontró el archivo de sonido: sounds/shoot.wav")
-    SND_SHOOT = None
-except Exception as e:
-    print(f"⚠️ Error al cargar el sonido de pistola: {e}")
-    SND_SHOOT = None
-
-# Cargar sonido de recarga (tecla R)
-print(f"🔊 Buscando sonido de recarga en: {os.path.join(BASE_DIR, 'sounds', 'reload.wav')}")
-print(f"🔊 ¿Existe el archivo de recarga? {os.path.exists(os.path.join(BASE_DIR, 'sounds', 'reload.wav'))}")
-
-try:
-    SND_RELOAD = pygame.mixer.Sound(os.path.join(BASE_DIR, "sounds", "reload.wav"))
-    SND_RELOAD.set_volume(0.6)
-    print("✅ Sonido de recarga cargado correctamente")
-except FileNotFoundError:
-    print("⚠️ No se encontró el archivo de sonido: sounds/reload.wav")
-    SND_RELOAD = None
-except Exception as e:
-    print(f"⚠️ Error al cargar el sonido de recarga: {e}")
-    SND_RELOAD = None
-
-# Cargar sonido de salto (SPACE / W / UP)
-print(f"🔊 Buscando sonido de salto en: {os.path.join(BASE_DIR, 'sounds', 'jump.wav')}")
-print(f"🔊 ¿Existe el archivo de salto? {os.path.exists(os.path.join(BASE_DIR, 'sounds', 'jump.wav'))}")
-
-try:
-    SND_JUMP = pygame.mixer.Sound(os.path.join(BASE_DIR, "sounds", "jump.wav"))
-    SND_JUMP.set_volume(0.5)
-    print("✅ Sonido de salto cargado correctamente")
-except FileNotFoundError:
-    print("⚠️ No se encontró el archivo de sonido: sounds/jump.wav")
-    SND_JUMP = None
-except Exception as e:
-    print(f"⚠️ Error al cargar el sonido de salto: {e}")
-    SND_JUMP = None
-
-# Cargar sonido de muerte (game over)
-print(f"🔊 Buscando sonido de muerte en: {os.path.join(BASE_DIR, 'sounds', 'game_over.wav')}")
-print(f"🔊 ¿Existe el archivo? {os.path.exists(os.path.join(BASE_DIR, 'sounds', 'game_over.wav'))}")
-
-try:
-    SND_GAME_OVER = pygame.mixer.Sound(os.path.join(BASE_DIR, "sounds", "game_over.wav"))
-    SND_GAME_OVER.set_volume(0.7)
-    print("✅ Sonido de muerte cargado correctamente")
-except FileNotFoundError:
-    print("⚠️ No se encontró el archivo de sonido: sounds/game_over.wav")
-    SND_GAME_OVER = None
-except Exception as e:
-    print(f"⚠️ Error al cargar el sonido de muerte: {e}")
-    SND_GAME_OVER = None
+SND_SLASH = SND_NEURAL = SND_SHOOT = SND_RELOAD = SND_JUMP = SND_GAME_OVER = None
+MUSIC_PATH = os.path.join(BASE_DIR, "sounds", "background_music.wav")
+
+def load_sounds():
+    global SND_SLASH, SND_NEURAL, SND_SHOOT, SND_RELOAD, SND_JUMP, SND_GAME_OVER
+    print(f"📁 Directorio actual: {BASE_DIR}")
+    print(f"🔊 Buscando sonido en: {os.path.join(BASE_DIR, 'sounds', 'slash.wav')}")
+    print(f"🔊 ¿Existe el archivo? {os.path.exists(os.path.join(BASE_DIR, 'sounds', 'slash.wav'))}")
+
+    try:
+        SND_SLASH = pygame.mixer.Sound(os.path.join(BASE_DIR, "sounds", "slash.wav"))
+        SND_SLASH.set_volume(0.6)
+        print("✅ Sonido de espada cargado correctamente")
+    except FileNotFoundError:
+        print("⚠️ No se encontró el archivo de sonido: sounds/slash.wav")
+        SND_SLASH = None
+    except Exception as e:
+        print(f"⚠️ Error al cargar el sonido: {e}")
+        SND_SLASH = None
+
+    # Cargar sonido de descarga neural (tecla L)
+    print(f"🔊 Buscando sonido de descarga en: {os.path.join(BASE_DIR, 'sounds', 'neural.wav')}")
+    print(f"🔊 ¿Existe el archivo de descarga? {os.path.exists(os.path.join(BASE_DIR, 'sounds', 'neural.wav'))}")
+
+    try:
+        SND_NEURAL = pygame.mixer.Sound(os.path.join(BASE_DIR, "sounds", "neural.wav"))
+        SND_NEURAL.set_volume(0.8)
+        print("✅ Sonido de descarga neural cargado correctamente")
+    except FileNotFoundError:
+        print("⚠️ No se encontró el archivo de sonido: sounds/neural.wav")
+        SND_NEURAL = None
+    except Exception as e:
+        print(f"⚠️ Error al cargar el sonido de descarga: {e}")
+        SND_NEURAL = None
+
+    # Cargar sonido de pistola (tecla K)
+    print(f"🔊 Buscando sonido de pistola en: {os.path.join(BASE_DIR, 'sounds', 'shoot.wav')}")
+    print(f"🔊 ¿Existe el archivo de pistola? {os.path.exists(os.path.join(BASE_DIR, 'sounds', 'shoot.wav'))}")
+
+    try:
+        SND_SHOOT = pygame.mixer.Sound(os.path.join(BASE_DIR, "sounds", "shoot.wav"))
+        SND_SHOOT.set_volume(0.5)
+        print("✅ Sonido de pistola cargado correctamente")
+    except FileNotFoundError:
+        print("⚠️ No se encontró el archivo de sonido: sounds/shoot.wav")
+        SND_SHOOT = None
+    except Exception as e:
+        print(f"⚠️ Error al cargar el sonido de pistola: {e}")
+        SND_SHOOT = None
+
+    # Cargar sonido de recarga (tecla R)
+    print(f"🔊 Buscando sonido de recarga en: {os.path.join(BASE_DIR, 'sounds', 'reload.wav')}")
+    print(f"🔊 ¿Existe el archivo de recarga? {os.path.exists(os.path.join(BASE_DIR, 'sounds', 'reload.wav'))}")
+
+    try:
+        SND_RELOAD = pygame.mixer.Sound(os.path.join(BASE_DIR, "sounds", "reload.wav"))
+        SND_RELOAD.set_volume(0.6)
+        print("✅ Sonido de recarga cargado correctamente")
+    except FileNotFoundError:
+        print("⚠️ No se encontró el archivo de sonido: sounds/reload.wav")
+        SND_RELOAD = None
+    except Exception as e:
+        print(f"⚠️ Error al cargar el sonido de recarga: {e}")
+        SND_RELOAD = None
+
+    # Cargar sonido de salto (SPACE / W / UP)
+    print(f"🔊 Buscando sonido de salto en: {os.path.join(BASE_DIR, 'sounds', 'jump.wav')}")
+    print(f"🔊 ¿Existe el archivo de salto? {os.path.exists(os.path.join(BASE_DIR, 'sounds', 'jump.wav'))}")
+
+    try:
+        SND_JUMP = pygame.mixer.Sound(os.path.join(BASE_DIR, "sounds", "jump.wav"))
+        SND_JUMP.set_volume(0.5)
+        print("✅ Sonido de salto cargado correctamente")
+    except FileNotFoundError:
+        print("⚠️ No se encontró el archivo de sonido: sounds/jump.wav")
+        SND_JUMP = None
+    except Exception as e:
+        print(f"⚠️ Error al cargar el sonido de salto: {e}")
+        SND_JUMP = None
+
+    # Cargar sonido de muerte (game over)
+    print(f"🔊 Buscando sonido de muerte en: {os.path.join(BASE_DIR, 'sounds', 'game_over.wav')}")
+    print(f"🔊 ¿Existe el archivo? {os.path.exists(os.path.join(BASE_DIR, 'sounds', 'game_over.wav'))}")
+
+    try:
+        SND_GAME_OVER = pygame.mixer.Sound(os.path.join(BASE_DIR, "sounds", "game_over.wav"))
+        SND_GAME_OVER.set_volume(0.7)
+        print("✅ Sonido de muerte cargado correctamente")
+    except FileNotFoundError:
+        print("⚠️ No se encontró el archivo de sonido: sounds/game_over.wav")
+        SND_GAME_OVER = None
+    except Exception as e:
+        print(f"⚠️ Error al cargar el sonido de muerte: {e}")
+        SND_GAME_OVER = None
 
     # Cargar música de fondo
-MUSIC_PATH = os.path.join(BASE_DIR, "sounds", "background_music.wav")
-print(f"🔊 Buscando música de fondo en: {MUSIC_PATH}")
-print(f"🔊 ¿Existe el archivo? {os.path.exists(MUSIC_PATH)}")
+    print(f"🔊 Buscando música de fondo en: {MUSIC_PATH}")
+    print(f"🔊 ¿Existe el archivo? {os.path.exists(MUSIC_PATH)}")
+
+    try:
+        pygame.mixer.music.load(MUSIC_PATH)
+        pygame.mixer.music.set_volume(0.3)  # Volumen más bajo para no tapar efectos
+        print("✅ Música de fondo cargada correctamente")
+    except Exception as e:
+        print(f"⚠️ Error al cargar la música de fondo: {e}")
 
-try:
-    pygame.mixer.music.load(MUSIC_PATH)
-    pygame.mixer.music.set_volume(0.3)  # Volumen más bajo para no tapar efectos
-    print("✅ Música de fondo cargada correctamente")
-except Exception as e:
-    print(f"⚠️ Error al cargar la música de fondo: {e}")
 
 # Imágenes de items (ponlas en una carpeta assets/ o images/)
 def load_item_images():
@@ -201,7 +246,7 @@ def load_item_images():
 
     return images
 
-ITEM_IMAGES = load_item_images()
+ITEM_IMAGES = {}
 
 # ─────────────────────────────────────────────────────────
 # SPRITES JUGADOR (reemplaza dibujo procedural)
@@ -247,9 +292,6 @@ def _make_player_frame(sheet, rect: pygame.Rect, canvas_w: int, canvas_h: int, s
     out_h = max(1, int(canvas_h * scale))
     return pygame.transform.smoothscale(canvas, (out_w, out_h))
 
-# Carga con fallback por si el nombre está mal escrito
-_player_sheet = _load_image_from_images("spites.png", "spirtes.png", "sprites.png")
-
 # ─────────────────────────────────────────────────────────
 # COORDENADAS PARA EL NUEVO SPRITESHEET (1024x1536)
 # Layout detectado:
@@ -259,8 +301,6 @@ _player_sheet = _load_image_from_images("spites.png", "spirtes.png", "sprites.pn
 # SHOOT : y 938..1254 (5 frames)  (la fila 5 se ignora)
 # ─────────────────────────────────────────────────────────
 
-SHEET_W, SHEET_H = _player_sheet.get_width(), _player_sheet.get_height()
-
 RUN_Y0,   RUN_H   = 0,   325
 IDLE_Y0,  IDLE_H  = 325, 290
 SLASH_Y0, SLASH_H = 615, 323
@@ -293,10 +333,10 @@ SRC_CANVAS_H = max(RUN_H, IDLE_H, SLASH_H, SHOOT_H)
 PLAYER_SPRITE_H = 96
 SPR_SCALE = PLAYER_SPRITE_H / SRC_CANVAS_H
 
-def _build_frames(x_ranges, y0, h):
+def _build_frames(sheet, x_ranges, y0, h):
     return [
         _make_player_frame(
-            _player_sheet,
+            sheet,
             pygame.Rect(x0, y0, (x1 - x0), h),
             SRC_CANVAS_W,
             SRC_CANVAS_H,
@@ -305,27 +345,165 @@ def _build_frames(x_ranges, y0, h):
         for (x0, x1) in x_ranges
     ]
 
-SPR_RUN_R   = _build_frames(RUN_X,   RUN_Y0,   RUN_H)
-SPR_IDLE_R  = _build_frames(IDLE_X,  IDLE_Y0,  IDLE_H)
-SPR_SLASH_R = _build_frames(SLASH_X, SLASH_Y0, SLASH_H)
-SPR_SHOOT_R = _build_frames(SHOOT_X, SHOOT_Y0, SHOOT_H)
+SPR_RUN_R = SPR_IDLE_R = SPR_SLASH_R = SPR_SHOOT_R = []
+SPR_RUN_L = SPR_IDLE_L = SPR_SLASH_L = SPR_SHOOT_L = []
+PLAYER_FRAME_W = PLAYER_FRAME_H = 0
+
+def _flipped(s):
+    return sdl2_render.mirror(pygame.transform.flip(s, True, False), s)
+
+def load_player_sprites():
+    """Corta el spritesheet del jugador. Necesita set_mode() (convert_alpha)."""
+    global SPR_RUN_R, SPR_IDLE_R, SPR_SLASH_R, SPR_SHOOT_R
+    global SPR_RUN_L, SPR_IDLE_L, SPR_SLASH_L, SPR_SHOOT_L
+    global PLAYER_FRAME_W, PLAYER_FRAME_H
 
-SPR_RUN_L   = [pygame.transform.flip(s, True, False) for s in SPR_RUN_R]
-SPR_IDLE_L  = [pygame.transform.flip(s, True, False) for s in SPR_IDLE_R]
-SPR_SLASH_L = [pygame.transform.flip(s, True, False) for s in SPR_SLASH_R]
-SPR_SHOOT_L = [pygame.transform.flip(s, True, False) for s in SPR_SHOOT_R]
+    # Carga con fallback por si el nombre está mal escrito
+    sheet = _load_image_from_images("spites.png", "spirtes.png", "sprites.png")
 
-# Dimensiones fijas (ya no cambian entre frames)
-PLAYER_FRAME_W = SPR_RUN_R[0].get_width()
-PLAYER_FRAME_H = SPR_RUN_R[0].get_height()
+    SPR_RUN_R   = _build_frames(sheet, RUN_X,   RUN_Y0,   RUN_H)
+    SPR_IDLE_R  = _build_frames(sheet, IDLE_X,  IDLE_Y0,  IDLE_H)
+    SPR_SLASH_R = _build_frames(sheet, SLASH_X, SLASH_Y0, SLASH_H)
+    SPR_SHOOT_R = _build_frames(sheet, SHOOT_X, SHOOT_Y0, SHOOT_H)
 
-try:
-    FNT_BIG = pygame.font.SysFont("consolas", 52, bold=True)
-    FNT_MED = pygame.font.SysFont("consolas", 30, bold=True)
-    FNT_SM  = pygame.font.SysFont("consolas", 19)
-    FNT_XS  = pygame.font.SysFont("consolas", 14)
-except Exception:
-    FNT_BIG = FNT_MED = FNT_SM = FNT_XS = pygame.font.Font(None, 28)
+    # Volteos registrados con mirror(): el backend SDL2 los dibuja con la
+    # textura del frame original y flip_x
+    SPR_RUN_L   = [_flipped(s) for s in SPR_RUN_R]
+    SPR_IDLE_L  = [_flipped(s) for s in SPR_IDLE_R]
+    SPR_SLASH_L = [_flipped(s) for s in SPR_SLASH_R]
+    SPR_SHOOT_L = [_flipped(s) for s in SPR_SHOOT_R]
+
+    # Dimensiones fijas (ya no cambian entre frames)
+    PLAYER_FRAME_W = SPR_RUN_R[0].get_width()
+    PLAYER_FRAME_H = SPR_RUN_R[0].get_height()
+
+FNT_BIG = FNT_MED = FNT_SM = FNT_XS = None
+
+def load_fonts():
+    global FNT_BIG, FNT_MED, FNT_SM, FNT_XS
+    try:
+        FNT_BIG = pygame.font.SysFont("consolas", 52, bold=True)
+        FNT_MED = pygame.font.SysFont("consolas", 30, bold=True)
+        FNT_SM  = pygame.font.SysFont("consolas", 19)
+        FNT_XS  = pygame.font.SysFont("consolas", 14)
+    except Exception:
+        FNT_BIG = FNT_MED = FNT_SM = FNT_XS = pygame.font.Font(None, 28)
+
+
+# ─────────────────────────────────────────────────────────
+# INICIALIZACIÓN
+# ─────────────────────────────────────────────────────────
+def init(headless=False):
+    """
+    Inicializa pygame y recursos. Llamar una vez antes de run() o simulate().
+    headless=True: sin ventana, sin audio y sin sprites ni fuentes; solo la
+    simulación (Player, Enemy, balas, Item, partículas, effects).
+    """
+    global HEADLESS, screen, display, W, H, ITEM_IMAGES
+    HEADLESS = headless
+    if headless:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+        pygame.init()
+        W, H = HEADLESS_W, HEADLESS_H
+        return
+
+    pygame.init()
+    pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
+    pygame.display.set_caption("NEUROCALIPSIS: El Último Fragmento")
+
+    settings = get_settings()
+    screen = None
+    if settings.get("render_backend", "software") == "sdl2":
+        screen = _sdl2_target(settings)
+    if screen is None:
+        # Pantalla completa (resolución nativa del monitor)
+        display = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+        screen = _render_target(display, settings)
+    W, H = screen.get_size()
+
+    # Inicializar sprites del drone (después de set_mode para que convert_alpha funcione)
+    drone_sprites.init()
+    load_sounds()
+    ITEM_IMAGES = load_item_images()
+    load_player_sprites()
+    load_fonts()
+
+
+# ─────────────────────────────────────────────────────────
+# RESOLUCIÓN INTERNA Y ESCALADO
+# ─────────────────────────────────────────────────────────
+SCALE_FILTERS = {"nearest": pygame.transform.scale,
+                 "smooth":  pygame.transform.smoothscale}
+_present_dst   = None   # zona de `display` (con bandas negras) donde va el frame
+_present_scale = None
+
+def _sdl2_target(settings):
+    """Crea el backend SDL2 y devuelve su canvas; None si no se puede usar."""
+    global display, backend
+    if not sdl2_render.available():
+        print("⚠️ pygame._sdl2 no disponible, se usa el dibujo por software")
+        return None
+    res = settings.get("render_resolution")
+    display = pygame.display.set_mode((1, 1), pygame.HIDDEN)
+    try:
+        backend = sdl2_render.SDL2Backend(pygame.display.get_caption()[0],
+                                          (int(res[0]), int(res[1])) if res else None,
+                                          filt=settings.get("render_filter", "smooth"))
+    except pygame.error as e:
+        print(f"⚠️ No se pudo crear el renderer SDL2 ({e}), se usa el dibujo por software")
+        backend = None
+        return None
+    fw, fh = backend.frame_size
+    print(f"🖥️ Renderer SDL2 ({'acelerado' if backend.accelerated else 'software'}) "
+          f"{fw}x{fh} → {backend.dest.w}x{backend.dest.h}")
+    return backend.screen
+
+def _render_target(disp, settings):
+    """Superficie donde se dibuja el juego: la ventana o una interna fija."""
+    global _present_dst, _present_scale
+    _present_dst = _present_scale = None
+    res = settings.get("render_resolution")
+    if not res:
+        return disp
+    rw, rh = int(res[0]), int(res[1])
+    dw, dh = disp.get_size()
+    if (rw, rh) == (dw, dh) or rw <= 0 or rh <= 0:
+        return disp
+    # Escalado uniforme centrado; el sobrante queda en negro
+    k = min(dw / rw, dh / rh)
+    sw, sh = round(rw * k), round(rh * k)
+    disp.fill((0, 0, 0))
+    _present_dst = disp.subsurface(((dw - sw) // 2, (dh - sh) // 2, sw, sh))
+    filt = settings.get("render_filter", "smooth")
+    if filt not in SCALE_FILTERS:
+        print(f"⚠️ render_filter desconocido: {filt!r}, se usa 'smooth'")
+        filt = "smooth"
+    _present_scale = SCALE_FILTERS[filt]
+    print(f"🖥️ Resolución interna {rw}x{rh} → {sw}x{sh} ({filt})")
+    return pygame.Surface((rw, rh)).convert(disp)
+
+def present():
+    """Lleva el frame a la ventana: un único escalado si hay resolución interna."""
+    if backend is not None:
+        backend.present()
+        return
+    if _present_dst is not None:
+        _present_scale(screen, _present_dst.get_size(), _present_dst)
+    pygame.display.flip()
+
+def mouse_pos():
+    """Posición del ratón en coordenadas de `screen`."""
+    mx, my = pygame.mouse.get_pos()
+    if backend is not None:
+        (ox, oy), (sw, sh) = backend.dest.topleft, backend.dest.size
+    elif _present_dst is not None:
+        ox, oy = _present_dst.get_abs_offset()
+        sw, sh = _present_dst.get_size()
+    else:
+        return mx, my
+    return (clamp((mx - ox) * W // sw, 0, W - 1),
+            clamp((my - oy) * H // sh, 0, H - 1))
 
 
 # ─────────────────────────────────────────────────────────
@@ -334,11 +512,17 @@ except Exception:
 def lerp(a, b, t):    return a + (b - a) * t
 def clamp(v, lo, hi): return max(lo, min(hi, v))
 
-def txt(surf, text, font, color, x, y, shadow=True):
+def txt(surf, text, font, color, x, y, shadow=True, glyphs=False):
+    """glyphs=True para texto que cambia a menudo (números): se compone
+    desde el atlas de glifos en vez de cachear cada cadena."""
+    if glyphs:
+        if shadow:
+            tc.draw_glyphs(surf, font, text, (0, 0, 0), x + 2, y + 2)
+        tc.draw_glyphs(surf, font, text, color, x, y)
+        return
     if shadow:
-        s = font.render(text, True, (0, 0, 0))
-        surf.blit(s, (x + 2, y + 2))
-    surf.blit(font.render(text, True, color), (x, y))
+        surf.blit(tc.render(font, text, (0, 0, 0)), (x + 2, y + 2))
+    surf.blit(tc.render(font, text, color), (x, y))
 
 def bar(surf, x, y, w, h, pct, fg, bg=DKGREY, border=CYAN, label=""):
     pct = clamp(pct, 0, 1)
@@ -347,35 +531,48 @@ def bar(surf, x, y, w, h, pct, fg, bg=DKGREY, border=CYAN, label=""):
         pygame.draw.rect(surf, fg, (x, y, int(w*pct), h), border_radius=3)
     pygame.draw.rect(surf, border, (x, y, w, h), 1,       border_radius=3)
     if label:
-        surf.blit(FNT_XS.render(label, True, WHITE), (x + 3, y + 1))
+        tc.draw_glyphs(surf, FNT_XS, label, WHITE, x + 3, y + 1)
+
+# Barras sin etiqueta horneadas por (ancho, alto, relleno en px, colores):
+# las barras de vida de los enemigos son un blit
+_bar_sprites = {}
+
+def bar_sprite(w, h, pct, fg, bg=DKGREY, border=CYAN):
+    key = (w, h, int(w * clamp(pct, 0, 1)), fg, bg, border)
+    s = _bar_sprites.get(key)
+    if s is None:
+        s = _bar_sprites[key] = pygame.Surface((w, h), pygame.SRCALPHA)
+        bar(s, 0, 0, w, h, pct, fg, bg, border)
+    return s
+
+# Mapa de luz del frame: mientras está abierto sobre `surf`, los glows se
+# encolan en él en vez de dibujarse directamente (ver lighting.py).
+lights = LightMap()
+# Capa de luz "detrás": glows que van bajo los sprites (glow de items, aura
+# neural). Se compone antes de dibujar las entidades.
+lights_behind = LightMap()
 
 def glow_circle(surf, color, cx, cy, radius, alpha=70):
-    s = pygame.Surface((radius * 4, radius * 4), pygame.SRCALPHA)
-    r, g, b = color
-    for i in range(3):
-        a   = alpha // (i + 1)
-        rad = radius + i * 4
-        pygame.draw.circle(s, (r, g, b, a), (radius * 2, radius * 2), rad)
-    surf.blit(s, (cx - radius * 2, cy - radius * 2),
+    if surf is lights.target:
+        lights.add(color, cx, cy, radius, alpha, "circle")
+        return
+    if _bake_rec is not None and surf is _bake_rec[0]:
+        _bake_rec[1].append((color, cx, cy, radius, alpha))
+        return
+    surf.blit(glow_sprite(color, radius, alpha, "circle"),
+              (cx - radius * 2, cy - radius * 2),
               special_flags=pygame.BLEND_RGBA_ADD)
     
-def glow_buble(surf, color, cx, cy, radius, alpha=70):
-    s = pygame.Surface((radius * 4, radius * 4), pygame.SRCALPHA)
-    r, g, b = color
-
-    # Rellena el centro completamente transparente
-    # y dibuja el borde degradado de afuera hacia adentro
-    num_rings = 12
-    for i in range(num_rings):
-        ratio = i / num_rings          # 0 = exterior, 1 = interior
-        rad = max(1, int(radius * (1 - ratio * 0.35)))
-        a = int(alpha * (1 - ratio))   # alfa va de 'alpha' a 0
-        pygame.draw.circle(s, (r, g, b, a),
-                           (radius * 2, radius * 2),
-                           rad, max(2, radius // num_rings))
-
+def glow_buble(surf, color, cx, cy, radius, alpha=70, behind=False):
+    """behind=True: glow detrás de un sprite; va a lights_behind, que se
+    compone antes que las entidades (lights se suma encima de todo)."""
+    lm = lights_behind if behind else lights
+    if surf is lm.target:
+        lm.add(color, cx, cy, radius, alpha, "buble")
+        return
     # Sin BLEND_RGBA_ADD para que el alpha funcione correctamente
-    surf.blit(s, (cx - radius * 2, cy - radius * 2))
+    surf.blit(glow_sprite(color, radius, alpha, "buble"),
+              (cx - radius * 2, cy - radius * 2))
 
 
 # ─────────────────────────────────────────────────────────
@@ -393,82 +590,63 @@ def draw_particles(surf, ox, oy):
     particle_system.draw(surf, ox, oy, W, H)
 
 
-def build_tile_grid(tiles, cell_size=TILE_CELL):
-    """Devuelve dict (cx, cy) -> lista de rects para colisión rápida de balas."""
-    grid = {}
-    for t in tiles:
-        cx_min = t.left // cell_size
-        cx_max = t.right // cell_size
-        cy_min = t.top // cell_size
-        cy_max = t.bottom // cell_size
-        for cx in range(cx_min, cx_max + 1):
-            for cy in range(cy_min, cy_max + 1):
-                key = (cx, cy)
-                if key not in grid:
-                    grid[key] = []
-                grid[key].append(t)
-    return grid
-
-
 # ─────────────────────────────────────────────────────────
 # PROYECTILES
 # ─────────────────────────────────────────────────────────
-class Bullet:
-    def __init__(self, x, y, dx, dy, dmg, col, speed, owner):
-        n = math.hypot(dx, dy) or 1
-        self.x, self.y   = float(x), float(y)
-        self.vx, self.vy = dx/n*speed, dy/n*speed
-        self.dmg, self.col, self.owner = dmg, col, owner
-        self.alive = True
-
-    def update(self, tile_grid):
-        self.x += self.vx
-        self.y += self.vy
-        if not (-50 < self.x < 9000 and -300 < self.y < 2000):
-            self.alive = False
-            return
-        cx, cy = int(self.x) // TILE_CELL, int(self.y) // TILE_CELL
-        for dx in (-1, 0, 1):
-            for dy in (-1, 0, 1):
-                key = (cx + dx, cy + dy)
-                for t in tile_grid.get(key, []):
-                    if t.collidepoint(self.x, self.y):
-                        self.alive = False
-                        spawn(self.x, self.y, self.col, 5, 2, 12, 3)
-                        return
-
-    def draw(self, surf, ox, oy):
-        sx, sy = int(self.x - ox), int(self.y - oy)
-        if -12 < sx < W + 12 and -12 < sy < H + 12:
-            # Ángulo de la dirección del disparo
-            angle = math.degrees(math.atan2(self.vy, self.vx))
-
-            # Dimensiones del rectángulo (largo x ancho)
-            bw, bh = 18, 6
-
-            # Crear superficie temporal con alpha para rotar
-            bsurf = pygame.Surface((bw + 4, bh + 4), pygame.SRCALPHA)
-            r, g, b = self.col
-
-            # Glow suave detrás
-            pygame.draw.rect(bsurf, (r, g, b, 60),
-                            (0, 0, bw + 4, bh + 4),
-                            border_radius=(bh + 4) // 2)
-
-            # Rectángulo principal con puntas redondeadas
-            pygame.draw.rect(bsurf, (r, g, b, 220),
-                            (2, 2, bw, bh),
-                            border_radius=bh // 2)
-
-            # Núcleo blanco brillante en el centro
-            pygame.draw.rect(bsurf, (255, 255, 255, 180),
-                            (4, 3, bw - 4, bh - 2),
-                            border_radius=(bh - 2) // 2)
-
-            # Rotar según dirección
-            rotated = pygame.transform.rotate(bsurf, -angle)
-            rw, rh = rotated.get_size()
-            surf.blit(rotated, (sx - rw // 2, sy - rh // 2))
+# Las balas viven en un BulletPool (bullets.py); aquí solo se dibujan.
+# Sprites cacheados por (color, ángulo cuantizado): dibujar una bala es un blit.
+BULLET_ANGLE_BUCKETS = 64
+_bullet_sprites = {}
+
+def draw_bullets(surf, pool, ox, oy):
+    n = pool.n
+    if n == 0:
+        return
+    sx = (pool.x[:n] - ox).astype(int)
+    sy = (pool.y[:n] - oy).astype(int)
+    vis = np.flatnonzero((-12 < sx) & (sx < W + 12) & (-12 < sy) & (sy < H + 12) & pool.alive[:n])
+    if len(vis) == 0:
+        return
+    ang = np.arctan2(pool.vy[vis], pool.vx[vis])
+    buckets = (np.rint(ang * (BULLET_ANGLE_BUCKETS / math.tau)).astype(int) % BULLET_ANGLE_BUCKETS).tolist()
+    cols = pool.col[vis].tolist()
+    seq = []
+    for col, bk, x, y in zip(cols, buckets, sx[vis].tolist(), sy[vis].tolist()):
+        key = (col[0], col[1], col[2], bk)
+        spr = _bullet_sprites.get(key)
+        if spr is None:
+            spr = _bullet_sprites[key] = _make_bullet_sprite(col, bk * 360 / BULLET_ANGLE_BUCKETS)
+        seq.append((spr, (x - spr.get_width() // 2, y - spr.get_height() // 2)))
+        if surf is lights.target:
+            lights.add(col, x, y, 6, 70, "soft")
+    surf.blits(seq, doreturn=False)
+
+def _make_bullet_sprite(col, angle):
+    """Bala de color col orientada a `angle` grados (0 = derecha)."""
+    # Dimensiones del rectángulo (largo x ancho)
+    bw, bh = 18, 6
+
+    # Crear superficie temporal con alpha para rotar
+    bsurf = pygame.Surface((bw + 4, bh + 4), pygame.SRCALPHA)
+    r, g, b = col
+
+    # Glow suave detrás
+    pygame.draw.rect(bsurf, (r, g, b, 60),
+                    (0, 0, bw + 4, bh + 4),
+                    border_radius=(bh + 4) // 2)
+
+    # Rectángulo principal con puntas redondeadas
+    pygame.draw.rect(bsurf, (r, g, b, 220),
+                    (2, 2, bw, bh),
+                    border_radius=bh // 2)
+
+    # Núcleo blanco brillante en el centro
+    pygame.draw.rect(bsurf, (255, 255, 255, 180),
+                    (4, 3, bw - 4, bh - 2),
+                    border_radius=(bh - 2) // 2)
+
+    # Rotar según dirección
+    return pygame.transform.rotate(bsurf, -angle)
 
 
 # ─────────────────────────────────────────────────────────
@@ -494,54 +672,71 @@ class SlashEffect:
         if self.life <= 0: self.alive = False
 
     def draw(self, surf, ox, oy):
-        ratio = self.life / self.max_life
+        frame = _slash_frame(self.facing == 1, self.life, self.max_life)
+        if frame is None:
+            return
+        arc, bx, by, tips = frame
         cx = int(self.cx - ox)
         cy = int(self.cy - oy)
+        surf.blit(arc, (cx + bx, cy + by))
 
-        r_outer = int(62 * ratio)
-        r_inner = int(36 * ratio)
+        a = int(90 * self.life / self.max_life)
+        for tx, ty in tips:
+            glow_circle(surf, CYAN, cx + tx, cy + ty, 7, a)
 
-        if r_outer < 2 or r_inner < 2:
-            return
 
-        # facing=1 = derecha (0°), facing=-1 = izquierda (180°)
-        base = 0.0 if self.facing == 1 else math.pi
-        spread = math.radians(65)
-        n = 18
-
-        outer = []
-        for i in range(n + 1):
-            ang = base - spread + (2 * spread * i / n)
-            outer.append((
-                cx + int(math.cos(ang) * r_outer),
-                cy + int(math.sin(ang) * r_outer)
-            ))
-
-        inner = []
-        for i in range(n + 1):
-            ang = base + spread - (2 * spread * i / n)
-            inner.append((
-                cx + int(math.cos(ang) * r_inner),
-                cy + int(math.sin(ang) * r_inner)
-            ))
-
-        pts = outer + inner
-        if len(pts) < 3:
-            return
+# Arcos pre-renderados por (mira a la derecha, vida): superficie ajustada a la
+# caja del arco, desplazamiento respecto al centro y puntas para los glows.
+_slash_frames = {}
+
+def _slash_frame(right, life, max_life):
+    key = (right, life, max_life)
+    if key in _slash_frames:
+        return _slash_frames[key]
+
+    ratio = life / max_life
+    r_outer = int(62 * ratio)
+    r_inner = int(36 * ratio)
+
+    if r_outer < 2 or r_inner < 2:
+        _slash_frames[key] = None
+        return None
 
-        s = pygame.Surface((surf.get_width(), surf.get_height()), pygame.SRCALPHA)
-        alpha = int(200 * ratio)
-        r, g, b = CYAN
+    # facing=1 = derecha (0°), facing=-1 = izquierda (180°)
+    base = 0.0 if right else math.pi
+    spread = math.radians(65)
+    n = 18
 
-        pygame.draw.polygon(s, (r, g, b, alpha // 3), pts)
-        pygame.draw.lines(s, (r, g, b, alpha), False, outer, 3)
-        pygame.draw.lines(s, (r, g, b, alpha // 2), False, inner, 2)
+    outer = []
+    for i in range(n + 1):
+        ang = base - spread + (2 * spread * i / n)
+        outer.append((int(math.cos(ang) * r_outer), int(math.sin(ang) * r_outer)))
 
-        surf.blit(s, (0, 0))
+    inner = []
+    for i in range(n + 1):
+        ang = base + spread - (2 * spread * i / n)
+        inner.append((int(math.cos(ang) * r_inner), int(math.sin(ang) * r_inner)))
 
-        glow_circle(surf, CYAN, outer[0][0],      outer[0][1],      7, int(90 * ratio))
-        glow_circle(surf, CYAN, outer[-1][0],     outer[-1][1],     7, int(90 * ratio))
-        #glow_circle(surf, CYAN, outer[n//2][0],   outer[n//2][1],   7, int(90 * ratio))
+    pts = outer + inner
+    pad = 3   # grosor de las líneas
+    bx = min(p[0] for p in pts) - pad
+    by = min(p[1] for p in pts) - pad
+    bw = max(p[0] for p in pts) + pad - bx + 1
+    bh = max(p[1] for p in pts) + pad - by + 1
+
+    s = pygame.Surface((bw, bh), pygame.SRCALPHA)
+    alpha = int(200 * ratio)
+    r, g, b = CYAN
+
+    def local(ps):
+        return [(x - bx, y - by) for x, y in ps]
+
+    pygame.draw.polygon(s, (r, g, b, alpha // 3), local(pts))
+    pygame.draw.lines(s, (r, g, b, alpha), False, local(outer), 3)
+    pygame.draw.lines(s, (r, g, b, alpha // 2), False, local(inner), 2)
+
+    frame = _slash_frames[key] = (s, bx, by, (outer[0], outer[-1]))
+    return frame
 
 # ─────────────────────────────────────────────────────────
 # JUGADOR – SAKÍ KISHIMOTO
@@ -642,9 +837,9 @@ class Player:
         if 'SND_SLASH' in globals() and SND_SLASH:
             SND_SLASH.play()
 
-    def do_shoot(self, wmx, wmy):
+    def do_shoot(self, wmx, wmy, bullets):
         if self.shoot_cd > 0 or self.ammo <= 0:
-            return None
+            return False
         self.ammo -= 1
         self.shoot_cd = 14
         dx = wmx - self.cx
@@ -656,7 +851,8 @@ class Player:
             SND_SHOOT.play()
             print("🔫 ¡Disparo!")
 
-        return Bullet(self.cx, self.cy, dx, dy, 22+(self.level-1)*4, CYAN, 14, "player")
+        bullets.spawn(self.cx, self.cy, dx, dy, 22+(self.level-1)*4, CYAN, 14, "player")
+        return True
 
     def do_neural(self):
         if self.neural_cd > 0:
@@ -670,7 +866,7 @@ class Player:
             SND_NEURAL.play()
             print("⚡ ¡Descarga Neural activada!")
 
-    def update(self, keys, tiles):
+    def update(self, keys, tile_index):
         for attr in ("slash_cd", "shoot_cd", "neural_cd", "hurt_t", "inv_t",
                      "neural_t", "combo_t", "levelup_t", "dash_timer", "dash_cooldown"):
             setattr(self, attr, max(0, getattr(self, attr, 0) - 1))
@@ -681,7 +877,8 @@ class Player:
         self.on_wall = False
         self.wall_side = 0
         r = self.rect
-        for t in tiles:
+        # Solo tiles a menos de 8 px a los lados (margen de 1 px por el redondeo)
+        for t in tile_index.query(r.x - 9, r.y - 1, r.w + 18, r.h + 2):
             if r.colliderect(t):
                 continue
             if self.vy != 0 or not self.on_ground:
@@ -705,7 +902,7 @@ class Player:
             # Faster animation when dashing, normal otherwise
             step = 4 if self.dash_timer > 0 else 6
             if self.walk_t % step == 0:
-                self.walk_fr = (self.walk_fr + 1) % len(SPR_RUN_R)
+                self.walk_fr = (self.walk_fr + 1) % len(RUN_X)
         else:
             if self.dash_timer <= 0:
                 self.vx = lerp(self.vx, 0, 0.18)
@@ -750,10 +947,11 @@ class Player:
 
         self.vy = min(self.vy + GRAV, 18)
 
-        # mover X + colisión
+        # mover X + colisión (candidatos: barrido entre posición previa y nueva)
+        prev = self.rect
         self.x += self.vx
         r = self.rect
-        for t in tiles:
+        for t in tile_index.query_rect(r.union(prev)):
             if r.colliderect(t):
                 if self.vx > 0:
                     self.x = t.left - self.PW
@@ -763,10 +961,11 @@ class Player:
                 r = self.rect
 
         # mover Y + colisión
+        prev = self.rect
         self.y += self.vy
         self.on_ground = False
         r = self.rect
-        for t in tiles:
+        for t in tile_index.query_rect(r.union(prev)):
             if r.colliderect(t):
                 if self.vy > 0:
                     self.y = t.top - self.PH
@@ -802,6 +1001,13 @@ class Player:
             if not se.alive:
                 self.slash_effects.remove(se)
 
+    def draw_aura(self, surf, ox, oy):
+        """Aura neural detrás del sprite (capa lights_behind)."""
+        if self.neural_t <= 0 or (self.hurt_t > 0 and (self.hurt_t // 3) % 2 == 0):
+            return
+        rx, ry = int(self.x - ox), int(self.y - oy)
+        glow_buble(surf, PURPLE, rx + self.PW // 2, ry + self.PH // 3, 52, 55, behind=True)
+
     def draw(self, surf, ox, oy):
         rx, ry = int(self.x - ox), int(self.y - oy)
 
@@ -835,10 +1041,6 @@ class Player:
             idx = (self.anim_t // 10) % len(SPR_IDLE_R)
             frame = (SPR_IDLE_L if facing_left else SPR_IDLE_R)[idx]
 
-        # Aura neural (detrás del sprite)
-        if self.neural_t > 0:
-            glow_buble(surf, PURPLE, rx + self.PW // 2, ry + self.PH  // 3, 52, 55)
-
         # Dibujar alineando "pies" con el collider
         px = rx + self.PW // 2 - PLAYER_FRAME_W // 2
         py = ry + self.PH - PLAYER_FRAME_H
@@ -852,6 +1054,24 @@ class Player:
 # ─────────────────────────────────────────────────────────
 # ENEMIGOS
 # ─────────────────────────────────────────────────────────
+# Drone procedural (sin drone_sprites.png): hexágono que gira, horneado por
+# (color, giro módulo 60°), centrado en un sprite de lado 2*R+1
+DRONE_FALLBACK_R = 16
+_drone_fallbacks = {}
+
+def _drone_fallback_sprite(col, rot):
+    key = (col, rot)
+    s = _drone_fallbacks.get(key)
+    if s is None:
+        c = DRONE_FALLBACK_R
+        s = _drone_fallbacks[key] = pygame.Surface((2*c + 1, 2*c + 1), pygame.SRCALPHA)
+        pts = [(c+int(14*math.cos(math.radians(a+rot))),
+                c+int(9 * math.sin(math.radians(a+rot)))) for a in range(0, 360, 60)]
+        pygame.draw.polygon(s, col, pts)
+        pygame.draw.polygon(s, CYAN, pts, 2)
+        pygame.draw.circle(s, CYAN, (c, c), 4)
+    return s
+
 class Enemy:
     def __init__(self, x, y, etype, lv=1):
         self.x, self.y   = float(x), float(y)
@@ -953,7 +1173,7 @@ class Enemy:
             return self.xp_val
         return 0
 
-    def update(self, player, tiles, bullets_list):
+    def update(self, player, tile_index, bullets):
         self.hurt_t = max(0, self.hurt_t - 1)
         self.attack_t = max(0, self.attack_t - 1)
         self.shoot_t = max(0, self.shoot_t - 1)
@@ -967,7 +1187,7 @@ class Enemy:
 
         # ── DRONE (flotante) ──────────────────────────────
         if self.etype == "drone":
-            t = pygame.time.get_ticks() * 0.002
+            t = self.anim_t * STEP_MS * 0.002
             self.y += math.sin(t + self.bob) * 0.45
             if dist < self.aggro_r:
                 tvx = (dx/dist)*self.speed*slow if dist > 2 else 0
@@ -977,12 +1197,12 @@ class Enemy:
                 self.vx *= 0.9
             self.x += self.vx
             if dist < self.at_r and self.attack_t <= 0:
-                bullets_list.append(
-                    Bullet(self.cx, self.cy, dx, dy, self.dmg, (90, 90, 245), 8, "enemy"))
+                bullets.spawn(self.cx, self.cy, dx, dy, self.dmg, (90, 90, 245), 8, "enemy")
                 self.attack_t = self.at_cd
             return
 
         # ── ENEMIGOS CON GRAVEDAD ─────────────────────────
+        # (update_ground_enemies hace lo mismo por lotes con NumPy)
         self.vy += GRAV
 
         if dist < self.aggro_r:
@@ -992,25 +1212,8 @@ class Enemy:
                 self.attack_windup = 0
             else:
                 self.vx *= 0.7
-                if self.attack_t <= 0 and self.attack_windup <= 0:
-                    self.attack_t = self.at_cd
-                    self.attack_windup = 22
-                if self.attack_windup > 0:
-                    self.attack_windup -= 1
-                elif self.attack_windup == 0:
-                    player.take_damage(self.dmg)
-                    effects.trigger_shake(is_melee_hit=True)
-                    spawn(player.cx, player.cy, RED, 7, 4, 20)
-                    self.attack_windup = -1
-                if self.attack_windup == -1 and self.attack_t <= 0:
-                    self.attack_windup = 0
-            # jefe fase 2: dispara
-            if self.etype == "jefe" and self.phase >= 2 and self.shoot_t <= 0:
-                bullets_list.append(
-                    Bullet(self.cx, self.cy, dx, dy, 18, PURPLE, 9, "enemy"))
-                bullets_list.append(
-                    Bullet(self.cx, self.cy, dx+60, dy, 18, PURPLE, 9, "enemy"))
-                self.shoot_t = 42
+                self._melee(player)
+            self._boss_shoot(dx, dy, bullets)
         else:
             self.patrol_t += 1
             self.vx = self.facing * self.speed * 0.45
@@ -1018,13 +1221,43 @@ class Enemy:
                 self.patrol_t = 0
                 self.facing *= -1
 
+        prev = self.rect
         self.x += self.vx
         self.y += self.vy
         self.vx *= 0.86
+        self._collide(tile_index, self.rect.union(prev))
+
+    def _melee(self, player):
+        """Ataque cuerpo a cuerpo (jugador dentro de at_r): carga y golpe."""
+        if self.attack_t <= 0 and self.attack_windup <= 0:
+            self.attack_t = self.at_cd
+            self.attack_windup = 22
+        if self.attack_windup > 0:
+            self.attack_windup -= 1
+        elif self.attack_windup == 0:
+            player.take_damage(self.dmg)
+            effects.trigger_shake(is_melee_hit=True)
+            spawn(player.cx, player.cy, RED, 7, 4, 20)
+            self.attack_windup = -1
+        if self.attack_windup == -1 and self.attack_t <= 0:
+            self.attack_windup = 0
+
+    def _boss_shoot(self, dx, dy, bullets):
+        """jefe fase 2: dispara (jugador dentro de aggro_r)."""
+        if self.etype == "jefe" and self.phase >= 2 and self.shoot_t <= 0:
+            bullets.spawn(self.cx, self.cy, dx, dy, 18, PURPLE, 9, "enemy")
+            bullets.spawn(self.cx, self.cy, dx+60, dy, 18, PURPLE, 9, "enemy")
+            self.shoot_t = 42
+
+    def _collide(self, tile_index, sweep):
+        """
+        Colisión con tiles y bordes tras integrar; sweep = (x, y, w, h) que
+        cubre el rect antes y después de moverse.
+        """
         self.on_ground = False
 
         r = self.rect
-        for t in tiles:
+        for t in tile_index.query(*sweep):
             if r.colliderect(t):
                 if self.vy > 0 and self.y + self.h - self.vy <= t.y + 5:
                     self.y = t.y - self.h
@@ -1047,7 +1280,7 @@ class Enemy:
         if self.on_ground and self.etype != "drone":
             probe_x = (self.x + self.w + 4) if self.vx > 0 else (self.x - 4)
             probe_y = self.y + self.h + 6
-            has_floor = any(t.collidepoint(probe_x, probe_y) for t in tiles)
+            has_floor = tile_index.tile_at(probe_x, probe_y) is not None
             if not has_floor:
                 self.facing *= -1
                 self.vx *= -1
@@ -1055,104 +1288,59 @@ class Enemy:
         if self.etype == "jefe" and self.hp < self.max_hp * 0.5:
             self.phase = 2
 
-    def draw(self, surf, ox, oy):
-        rx, ry = int(self.x - ox), int(self.y - oy)
-        if rx < -120 or rx > W + 120:
-            return
+    def pose(self):
+        """Parámetros que determinan el dibujo en este frame (clave del atlas)."""
         col = RED if self.hurt_t > 0 else self.col
         if getattr(self, "slowed", False):
             r, g, b = col
             col = (min(255, r + 80), min(255, g + 20), min(255, b + 120))
-            pulse = 0.7 + 0.3 * math.sin(pygame.time.get_ticks() * 0.01)
+            # Pulso cuantizado a SLOW_PULSE_LEVELS niveles
+            q = round((math.sin(self.anim_t * STEP_MS * 0.01) + 1) * (SLOW_PULSE_LEVELS - 1) / 2)
+            pulse = 0.7 + 0.3 * (2 * q / (SLOW_PULSE_LEVELS - 1) - 1)
             col = (int(col[0] * pulse), int(col[1] * pulse), min(255, int(col[2] * 1.2)))
+        return self.pose_at(self.anim_t, col, self.facing, abs(self.vx),
+                            getattr(self, "attack_windup", 0))
 
-        t = self.anim_t * 0.08
-        atk_raise = 0
-        if getattr(self, "attack_windup", 0) > 0:
-            atk_raise = (1 - self.attack_windup / 22.0) * 12
-
+    def pose_at(self, anim_t, col, facing, speed, windup):
+        t = anim_t * 0.08
+        atk_glow = windup > 0
         if self.etype == "infectado":
-            sway   = int(math.sin(t) * 1.5)
-            moving = abs(self.vx) > 0.5
-            leg_f  = math.sin(t * 1.9) * 6  if moving else 0
-            arm_f  = math.sin(t * 1.9 + math.pi) * 5 if moving else 0
-            atk_glow = getattr(self, "attack_windup", 0) > 0
-
-            # Lighter accent colour
-            light = (min(255, col[0]+55), min(255, col[1]+55), min(255, col[2]+65))
-            dim   = (max(0, col[0]-25),   max(0, col[1]-20),   max(0, col[2]-20))
-
-            # ── Legs ──────────────────────────────────────────
-            foot_l = (rx + 5 + int( leg_f), ry + self.h - 2)
-            foot_r = (rx + self.w - 5 - int(leg_f), ry + self.h - 2)
-            knee_l = (rx + 7 + sway, ry + 28)
-            knee_r = (rx + self.w - 7 + sway, ry + 28)
-            pygame.draw.line(surf, dim,   knee_l, foot_l, 4)
-            pygame.draw.line(surf, dim,   knee_r, foot_r, 4)
-            pygame.draw.rect(surf, light, (foot_l[0]-4, foot_l[1]-2, 8, 4), border_radius=2)
-            pygame.draw.rect(surf, light, (foot_r[0]-4, foot_r[1]-2, 8, 4), border_radius=2)
-
-            # ── Pelvis / hip connector ─────────────────────────
-            pygame.draw.rect(surf, dim, (rx + 5 + sway, ry + 26, self.w - 10, 6), border_radius=2)
-
-            # ── Torso ─────────────────────────────────────────
-            pygame.draw.rect(surf, col,  (rx + 4 + sway, ry + 17, self.w - 8, 12), border_radius=3)
-            # Chest core crystal (glows when attacking)
-            core_c = PINK if atk_glow else (180, 30, 50)
-            pygame.draw.rect(surf, core_c, (rx + self.w//2 - 3 + sway, ry + 19, 6, 6), border_radius=2)
-            if atk_glow:
-                glow_circle(surf, PINK,  rx + self.w//2 + sway, ry + 22, 7, 110)
-            else:
-                glow_circle(surf, core_c, rx + self.w//2 + sway, ry + 22, 4, 50)
-            # Trim line
-            pygame.draw.line(surf, light, (rx + 5 + sway, ry + 18), (rx + self.w - 5 + sway, ry + 18), 1)
-
-            # ── Shoulder armour ────────────────────────────────
-            pygame.draw.rect(surf, light, (rx      + sway, ry + 16, 7, 8), border_radius=2)
-            pygame.draw.rect(surf, light, (rx + self.w - 7 + sway, ry + 16, 7, 8), border_radius=2)
-
-            # ── Arms ──────────────────────────────────────────
-            arm_ty = ry + 19
-            hand_l = (rx - 1 + sway, arm_ty + 9 + int(arm_f))
-            hand_r = (rx + self.w + 1 + sway, arm_ty + 9 - int(arm_f))
-            pygame.draw.line(surf, dim, (rx + 3 + sway, arm_ty), hand_l, 3)
-            pygame.draw.line(surf, dim, (rx + self.w - 3 + sway, arm_ty), hand_r, 3)
-            pygame.draw.circle(surf, light, hand_l, 3)
-            pygame.draw.circle(surf, light, hand_r, 3)
-
-            # ── Neck ──────────────────────────────────────────
-            pygame.draw.rect(surf, dim, (rx + 10 + sway, ry + 12, 6, 6))
-
-            # ── Head ──────────────────────────────────────────
-            head_y = ry + 2 - int(atk_raise)
-            pygame.draw.rect(surf, col, (rx + 4 + sway, head_y, self.w - 8, 12), border_radius=4)
-            # Visor band
-            v_col = (255, 50, 50) if atk_glow else (170, 30, 35)
-            pygame.draw.rect(surf, v_col, (rx + 5 + sway, head_y + 4, self.w - 10, 5), border_radius=2)
-            # Individual LED eyes
-            ex = rx + (7 if self.facing > 0 else self.w - 11) + sway
-            pygame.draw.rect(surf, (255, 240, 180), (ex,     head_y + 5, 3, 3))
-            pygame.draw.rect(surf, (255, 240, 180), (ex + 4, head_y + 5, 3, 3))
-            eye_intensity = 90 if atk_glow else 45
-            glow_circle(surf, (255, 80, 50), ex + 1,     head_y + 6, 4, eye_intensity)
-            glow_circle(surf, (255, 80, 50), ex + 5,     head_y + 6, 4, eye_intensity)
-            # Antenna
-            ant_x = rx + self.w // 2 + sway
-            pygame.draw.line(surf, CYAN, (ant_x, head_y), (ant_x, head_y - 6), 1)
-            pygame.draw.circle(surf, CYAN, (ant_x, head_y - 6), 2)
-            glow_circle(surf, CYAN, ant_x, head_y - 6, 3, 50)
-
-        elif self.etype == "drone":
-            frame = drone_sprites.get_frame(self.anim_t, self.attack_t, self.at_cd, self.facing)
+            moving = speed > 0.5
+            atk_raise = int((1 - windup / 22.0) * 12) if atk_glow else 0
+            return ("infectado", self.w, self.h, col, facing,
+                    int(math.sin(t) * 1.5),
+                    int(math.sin(t * 1.9) * 6) if moving else 0,
+                    int(math.sin(t * 1.9 + math.pi) * 5) if moving else 0,
+                    atk_glow, atk_raise)
+        if self.etype == "mutante":
+            moving = speed > 0.4
+            breath = 1.0 + 0.04 * math.sin(t)
+            return ("mutante", self.w, self.h, col,
+                    int(math.sin(t * 1.5) * 8) if moving else 0,
+                    int(math.sin(t * 1.5 + math.pi) * 10) if moving else 0,
+                    atk_glow, int((self.w - 6) * breath), int(18 * breath))
+        if self.etype == "jefe":
+            pulse = 0.85 + 0.15 * math.sin(t * 1.5)
+            breath = 1.0 + 0.03 * math.sin(t)
+            return ("jefe", self.w, self.h, col,
+                    int(55 * pulse), int(32 * breath), self.phase >= 2)
+        return None
+
+    def draw(self, surf, ox, oy):
+        rx, ry = int(self.x - ox), int(self.y - oy)
+        if rx < -120 or rx > W + 120:
+            return
+
+        if self.etype == "drone":
+            # Tinte rojo al recibir daño (parpadeo), púrpura si está ralentizado
+            tint = drone_sprites.TINT_NONE
+            if self.hurt_t > 0 and (self.hurt_t // 3) % 2 == 0:
+                tint |= drone_sprites.TINT_HURT
+            if getattr(self, "slowed", False):
+                tint |= drone_sprites.TINT_SLOWED
+            frame = drone_sprites.get_frame(self.anim_t, self.attack_t, self.at_cd,
+                                            self.facing, tint)
             if frame is not None:
-                # Tinte rojo al recibir daño
-                if self.hurt_t > 0 and (self.hurt_t // 3) % 2 == 0:
-                    frame = frame.copy()
-                    frame.fill((200, 0, 0, 0), special_flags=pygame.BLEND_RGB_ADD)
-                # Tinte púrpura cuando está ralentizado (descarga neural)
-                if getattr(self, "slowed", False):
-                    frame = frame.copy()
-                    frame.fill((70, 0, 140, 0), special_flags=pygame.BLEND_RGB_ADD)
                 fw, fh = frame.get_size()
                 # Centrar sobre el collider del drone
                 draw_x = rx + self.w // 2 - fw // 2
@@ -1161,86 +1349,21 @@ class Enemy:
             else:
                 # Fallback procedural si no hay sprite
                 cx2, cy2 = rx + self.w//2, ry + self.h//2
-                rot = (self.anim_t * 2) % 360
-                pts = [(cx2+int(14*math.cos(math.radians(a+rot))),
-                        cy2+int(9 * math.sin(math.radians(a+rot)))) for a in range(0, 360, 60)]
-                bob = int(math.sin(t) * 2)
-                pts = [(p[0], p[1] + bob) for p in pts]
+                bob = int(math.sin(self.anim_t * 0.08) * 2)
                 col = RED if self.hurt_t > 0 else self.col
-                pygame.draw.polygon(surf, col, pts)
-                pygame.draw.polygon(surf, CYAN, pts, 2)
-                pygame.draw.circle(surf, CYAN, (cx2, cy2 + bob), 4)
+                spr = _drone_fallback_sprite(col, (self.anim_t * 2) % 60)
+                surf.blit(spr, (cx2 - DRONE_FALLBACK_R, cy2 + bob - DRONE_FALLBACK_R))
                 glow_circle(surf, CYAN, cx2, cy2 + bob, 12, 55)
 
-        elif self.etype == "mutante":
-            moving = abs(self.vx) > 0.4
-            leg_f  = math.sin(t * 1.5) * 8 if moving else 0
-            arm_sw = math.sin(t * 1.5 + math.pi) * 10 if moving else 0
-            atk_glow = getattr(self, "attack_windup", 0) > 0
-            breath = 1.0 + 0.04 * math.sin(t)
-            light = (min(255, col[0]+45), min(255, col[1]+35), min(255, col[2]+20))
-            dim   = (max(0, col[0]-20),   max(0, col[1]-15),   max(0, col[2]-10))
-
-            # Legs — thick powerful limbs
-            pygame.draw.line(surf, dim, (rx+14, ry+self.h-22), (rx+8+int(leg_f),  ry+self.h-2), 7)
-            pygame.draw.line(surf, dim, (rx+30, ry+self.h-22), (rx+36-int(leg_f), ry+self.h-2), 7)
-            pygame.draw.rect(surf, light, (rx+4+int(leg_f),   ry+self.h-6, 10, 6), border_radius=3)
-            pygame.draw.rect(surf, light, (rx+30-int(leg_f),  ry+self.h-6, 10, 6), border_radius=3)
-
-            # Main body
-            bw, bh = int((self.w - 6) * breath), self.h - 28
-            bx = rx + 3 - (bw - (self.w - 6)) // 2
-            pygame.draw.rect(surf, col,  (bx, ry + 28, bw, bh), border_radius=5)
-            # Belly segments
-            for i in range(3):
-                seg_y = ry + 32 + i * 10
-                pygame.draw.line(surf, dim, (bx + 3, seg_y), (bx + bw - 3, seg_y), 1)
-
-            # Shoulder pads (wide)
-            pygame.draw.rect(surf, light, (rx - 2, ry + 22, 12, 10), border_radius=3)
-            pygame.draw.rect(surf, light, (rx + self.w - 10, ry + 22, 12, 10), border_radius=3)
-
-            # Arms (heavy, swinging)
-            pygame.draw.line(surf, col, (rx + 4,          ry + 24), (rx - 6,          ry + 38 + int(arm_sw)), 6)
-            pygame.draw.line(surf, col, (rx + self.w - 4, ry + 24), (rx + self.w + 6, ry + 38 - int(arm_sw)), 6)
-            # Fists / claws
-            claw_l = (rx - 8,          ry + 38 + int(arm_sw))
-            claw_r = (rx + self.w + 8, ry + 38 - int(arm_sw))
-            for dx2, dy2 in [(-3,-3),(0,-4),(3,-3)]:
-                pygame.draw.line(surf, ORANGE, claw_l, (claw_l[0]+dx2, claw_l[1]+dy2+(-5 if atk_glow else 0)), 2)
-                pygame.draw.line(surf, ORANGE, claw_r, (claw_r[0]-dx2, claw_r[1]+dy2+(-5 if atk_glow else 0)), 2)
-
-            # Head (larger, brutish)
-            pygame.draw.circle(surf, col, (rx + self.w // 2, ry + 22), int(18 * breath))
-            # Bony spikes on head
-            for i, sx2 in enumerate([rx+self.w//2-14, rx+self.w//2, rx+self.w//2+14]):
-                h_spk = 8 + i % 2 * 4
-                pygame.draw.polygon(surf, ORANGE, [(sx2-4, ry+10),(sx2+4, ry+10),(sx2, ry+10-h_spk)])
-            # Eyes — three (creepy)
-            ec = RED if atk_glow else (200, 30, 30)
-            for ex_off in (-8, 0, 8):
-                pygame.draw.circle(surf, ec, (rx + self.w//2 + ex_off, ry + 20), 3)
-                if atk_glow:
-                    glow_circle(surf, RED, rx + self.w//2 + ex_off, ry + 20, 5, 100)
-                else:
-                    glow_circle(surf, ec,  rx + self.w//2 + ex_off, ry + 20, 3, 40)
-            # Mouth gash
-            pygame.draw.line(surf, (200, 0, 0), (rx + self.w//2 - 8, ry + 26), (rx + self.w//2 + 8, ry + 26), 2)
-
-        elif self.etype == "jefe":
-            pulse = 0.85 + 0.15 * math.sin(t * 1.5)
-            r_glow = int(55 * pulse)
-            glow_circle(surf, PURPLE, rx+self.w//2, ry+self.h//2, r_glow, 70)
-            breath = 1.0 + 0.03 * math.sin(t)
-            pygame.draw.rect(surf, col, (rx, ry+32, self.w, self.h-32), border_radius=8)
-            pygame.draw.circle(surf, col, (rx+self.w//2, ry+30), int(32 * breath))
-            ec = PURPLE if self.phase < 2 else PINK
-            for off in (-12, 12):
-                pygame.draw.circle(surf, ec, (rx+self.w//2+off, ry+26), 6)
-                glow_circle(surf, ec, rx+self.w//2+off, ry+26, 12, 130)
-            for i in range(4):
-                cy_ = ry + 44 + i*12
-                pygame.draw.line(surf, PURPLE, (rx+8, cy_), (rx+self.w-8, cy_), 1)
+        else:
+            pose = self.pose()
+            if pose is not None and ENEMY_ATLAS:
+                spr, dx, dy, glows = enemy_atlas.get(pose)
+                surf.blit(spr, (rx + dx, ry + dy))
+                for c, gx, gy, gr, ga in glows:
+                    glow_circle(surf, c, rx + gx, ry + gy, gr, ga)
+            elif pose is not None:
+                draw_enemy_pose(surf, pose, rx, ry)
 
         # HP bar — always drawn on top, color-coded by type
         hp_pct  = self.hp / self.max_hp
@@ -1251,7 +1374,287 @@ class Enemy:
             "drone":    (90, 90, 245),
         }.get(self.etype, RED)
         bw2 = self.w + 10
-        bar(surf, rx - 5, ry - 11, bw2, 6, hp_pct, bar_col)
+        surf.blit(bar_sprite(bw2, 6, hp_pct, bar_col), (rx - 5, ry - 11))
+
+
+# Cinemática de los enemigos con gravedad por lotes (NumPy). Por debajo de
+# KINEMATICS_MIN_BATCH enemigos el coste fijo de NumPy no compensa y se usa
+# Enemy.update uno a uno.
+KINEMATICS_MIN_BATCH = 32
+
+def update_enemies(enemies, player, tile_index, bullets):
+    """
+    Un paso de los enemigos dados (vivos). Los drones van uno a uno; los
+    demás por update_ground_enemies. Mismo resultado que Enemy.update, salvo
+    el orden de los disparos de drones respecto al resto.
+    """
+    ground = []
+    for e in enemies:
+        if e.etype == "drone":
+            e.update(player, tile_index, bullets)
+        else:
+            ground.append(e)
+    if len(ground) < KINEMATICS_MIN_BATCH:
+        for e in ground:
+            e.update(player, tile_index, bullets)
+    else:
+        update_ground_enemies(ground, player, tile_index, bullets)
+
+_KIN_FIELDS = operator.attrgetter("x", "y", "vx", "vy", "w", "h", "speed", "aggro_r", "at_r",
+                                  "facing", "patrol_t", "hurt_t", "attack_t", "shoot_t")
+
+def update_ground_enemies(enemies, player, tile_index, bullets):
+    """
+    Rama con gravedad de Enemy.update por lotes: temporizadores, distancia
+    al jugador, dirección, velocidad de persecución/patrulla, gravedad,
+    integración y rozamiento en una pasada NumPy. El ataque cuerpo a cuerpo,
+    los disparos del jefe y la colisión con tiles siguen siendo por enemigo,
+    en el mismo orden que antes.
+    """
+    if not enemies:
+        return
+    cols = np.array(list(map(_KIN_FIELDS, enemies)), dtype=np.float64).T
+    x, y, vx, vy, w, h, speed, aggro_r, at_r = cols[:9]
+    facing, patrol_t, hurt_t, attack_t, shoot_t = cols[9:].astype(np.int64)
+
+    hurt_t = np.maximum(hurt_t - 1, 0)
+    attack_t = np.maximum(attack_t - 1, 0)
+    shoot_t = np.maximum(shoot_t - 1, 0)
+
+    dx = player.cx - (x + w / 2)
+    dy = player.cy - (y + h / 2)
+    dist = np.hypot(dx, dy)
+    aggro = dist < aggro_r
+    slowed = aggro if player.neural_t > 0 else np.zeros_like(aggro)
+    slow = 0.35 if player.neural_t > 0 else 1.0
+
+    vy = vy + GRAV
+    # persecución / cuerpo a cuerpo / patrulla
+    facing = np.where(aggro, np.where(dx >= 0, 1, -1), facing)
+    chase = aggro & (np.abs(dx) > at_r)
+    melee = aggro & ~chase
+    patrol = ~aggro
+    vx = np.where(chase, facing * speed * slow,
+                  np.where(melee, vx * 0.7, facing * speed * 0.45))
+    patrol_t = patrol_t + patrol
+    turn = patrol & (patrol_t > 160)
+    patrol_t[turn] = 0
+    facing = np.where(turn, -facing, facing)
+
+    nx = x + vx
+    ny = y + vy
+    nvx = vx * 0.86
+    # rect barrido (unión de rect antes y después) para la consulta de tiles
+    ix0, iy0 = np.trunc(x), np.trunc(y)
+    ix1, iy1 = np.trunc(nx), np.trunc(ny)
+    sx, sy = np.minimum(ix0, ix1), np.minimum(iy0, iy1)
+    sweep = zip(sx.tolist(), sy.tolist(),
+                (np.maximum(ix0, ix1) + w - sx).tolist(),
+                (np.maximum(iy0, iy1) + h - sy).tolist())
+
+    for (e, ht, at, st, sl, ag, ml, ddx, ddy, f, pt, ex, ey, evx, evy, sw) in zip(
+            enemies, hurt_t.tolist(), attack_t.tolist(), shoot_t.tolist(),
+            slowed.tolist(), aggro.tolist(), melee.tolist(), dx.tolist(), dy.tolist(),
+            facing.tolist(), patrol_t.tolist(), nx.tolist(), ny.tolist(),
+            nvx.tolist(), vy.tolist(), sweep):
+        e.hurt_t, e.attack_t, e.shoot_t = ht, at, st
+        e.anim_t += 1
+        e.slowed = sl
+        if ag:
+            if ml:
+                e._melee(player)
+            else:
+                e.attack_windup = 0
+            e._boss_shoot(ddx, ddy, bullets)
+        e.facing, e.patrol_t = f, pt
+        e.x, e.y, e.vx, e.vy = ex, ey, evx, evy
+        e._collide(tile_index, sw)
+
+
+# Enemigos procedurales (infectado, mutante, jefe): la pose se hornea en un
+# atlas y se dibuja con un blit; sus glows se reenvían al mapa de luz.
+# ENEMY_ATLAS = False dibuja en vivo con draw_enemy_pose (la referencia).
+# Solo con el dibujo por software: pygame.draw no acepta el canvas SDL2.
+ENEMY_ATLAS = True
+ATLAS_BAKE_WORKERS = 0    # >1: hornear al cargar nivel con un pool de procesos
+ENEMY_POSE_PAD = 24       # margen del lienzo de horneado alrededor del collider
+SLOW_PULSE_LEVELS = 8
+# Fotogramas de anim_t tras los que se repiten las poses (sin(t) y sin(1.9t))
+ANIM_BAKE_FRAMES = 786
+
+def draw_enemy_pose(surf, pose, rx, ry):
+    """Dibujo procedural de una pose con el collider en (rx, ry)."""
+    etype, w, h, col = pose[:4]
+    if etype == "infectado":
+        facing, sway, leg_f, arm_f, atk_glow, atk_raise = pose[4:]
+
+        # Lighter accent colour
+        light = (min(255, col[0]+55), min(255, col[1]+55), min(255, col[2]+65))
+        dim   = (max(0, col[0]-25),   max(0, col[1]-20),   max(0, col[2]-20))
+
+        # ── Legs ──────────────────────────────────────────
+        foot_l = (rx + 5 + int( leg_f), ry + h - 2)
+        foot_r = (rx + w - 5 - int(leg_f), ry + h - 2)
+        knee_l = (rx + 7 + sway, ry + 28)
+        knee_r = (rx + w - 7 + sway, ry + 28)
+        pygame.draw.line(surf, dim,   knee_l, foot_l, 4)
+        pygame.draw.line(surf, dim,   knee_r, foot_r, 4)
+        pygame.draw.rect(surf, light, (foot_l[0]-4, foot_l[1]-2, 8, 4), border_radius=2)
+        pygame.draw.rect(surf, light, (foot_r[0]-4, foot_r[1]-2, 8, 4), border_radius=2)
+
+        # ── Pelvis / hip connector ─────────────────────────
+        pygame.draw.rect(surf, dim, (rx + 5 + sway, ry + 26, w - 10, 6), border_radius=2)
+
+        # ── Torso ─────────────────────────────────────────
+        pygame.draw.rect(surf, col,  (rx + 4 + sway, ry + 17, w - 8, 12), border_radius=3)
+        # Chest core crystal (glows when attacking)
+        core_c = PINK if atk_glow else (180, 30, 50)
+        pygame.draw.rect(surf, core_c, (rx + w//2 - 3 + sway, ry + 19, 6, 6), border_radius=2)
+        if atk_glow:
+            glow_circle(surf, PINK,  rx + w//2 + sway, ry + 22, 7, 110)
+        else:
+            glow_circle(surf, core_c, rx + w//2 + sway, ry + 22, 4, 50)
+        # Trim line
+        pygame.draw.line(surf, light, (rx + 5 + sway, ry + 18), (rx + w - 5 + sway, ry + 18), 1)
+
+        # ── Shoulder armour ────────────────────────────────
+        pygame.draw.rect(surf, light, (rx      + sway, ry + 16, 7, 8), border_radius=2)
+        pygame.draw.rect(surf, light, (rx + w - 7 + sway, ry + 16, 7, 8), border_radius=2)
+
+        # ── Arms ──────────────────────────────────────────
+        arm_ty = ry + 19
+        hand_l = (rx - 1 + sway, arm_ty + 9 + int(arm_f))
+        hand_r = (rx + w + 1 + sway, arm_ty + 9 - int(arm_f))
+        pygame.draw.line(surf, dim, (rx + 3 + sway, arm_ty), hand_l, 3)
+        pygame.draw.line(surf, dim, (rx + w - 3 + sway, arm_ty), hand_r, 3)
+        pygame.draw.circle(surf, light, hand_l, 3)
+        pygame.draw.circle(surf, light, hand_r, 3)
+
+        # ── Neck ──────────────────────────────────────────
+        pygame.draw.rect(surf, dim, (rx + 10 + sway, ry + 12, 6, 6))
+
+        # ── Head ──────────────────────────────────────────
+        head_y = ry + 2 - int(atk_raise)
+        pygame.draw.rect(surf, col, (rx + 4 + sway, head_y, w - 8, 12), border_radius=4)
+        # Visor band
+        v_col = (255, 50, 50) if atk_glow else (170, 30, 35)
+        pygame.draw.rect(surf, v_col, (rx + 5 + sway, head_y + 4, w - 10, 5), border_radius=2)
+        # Individual LED eyes
+        ex = rx + (7 if facing > 0 else w - 11) + sway
+        pygame.draw.rect(surf, (255, 240, 180), (ex,     head_y + 5, 3, 3))
+        pygame.draw.rect(surf, (255, 240, 180), (ex + 4, head_y + 5, 3, 3))
+        eye_intensity = 90 if atk_glow else 45
+        glow_circle(surf, (255, 80, 50), ex + 1,     head_y + 6, 4, eye_intensity)
+        glow_circle(surf, (255, 80, 50), ex + 5,     head_y + 6, 4, eye_intensity)
+        # Antenna
+        ant_x = rx + w // 2 + sway
+        pygame.draw.line(surf, CYAN, (ant_x, head_y), (ant_x, head_y - 6), 1)
+        pygame.draw.circle(surf, CYAN, (ant_x, head_y - 6), 2)
+        glow_circle(surf, CYAN, ant_x, head_y - 6, 3, 50)
+
+    elif etype == "mutante":
+        leg_f, arm_sw, atk_glow, body_w, head_r = pose[4:]
+        light = (min(255, col[0]+45), min(255, col[1]+35), min(255, col[2]+20))
+        dim   = (max(0, col[0]-20),   max(0, col[1]-15),   max(0, col[2]-10))
+
+        # Legs — thick powerful limbs
+        pygame.draw.line(surf, dim, (rx+14, ry+h-22), (rx+8+int(leg_f),  ry+h-2), 7)
+        pygame.draw.line(surf, dim, (rx+30, ry+h-22), (rx+36-int(leg_f), ry+h-2), 7)
+        pygame.draw.rect(surf, light, (rx+4+int(leg_f),   ry+h-6, 10, 6), border_radius=3)
+        pygame.draw.rect(surf, light, (rx+30-int(leg_f),  ry+h-6, 10, 6), border_radius=3)
+
+        # Main body
+        bw, bh = body_w, h - 28
+        bx = rx + 3 - (bw - (w - 6)) // 2
+        pygame.draw.rect(surf, col,  (bx, ry + 28, bw, bh), border_radius=5)
+        # Belly segments
+        for i in range(3):
+            seg_y = ry + 32 + i * 10
+            pygame.draw.line(surf, dim, (bx + 3, seg_y), (bx + bw - 3, seg_y), 1)
+
+        # Shoulder pads (wide)
+        pygame.draw.rect(surf, light, (rx - 2, ry + 22, 12, 10), border_radius=3)
+        pygame.draw.rect(surf, light, (rx + w - 10, ry + 22, 12, 10), border_radius=3)
+
+        # Arms (heavy, swinging)
+        pygame.draw.line(surf, col, (rx + 4,          ry + 24), (rx - 6,          ry + 38 + int(arm_sw)), 6)
+        pygame.draw.line(surf, col, (rx + w - 4, ry + 24), (rx + w + 6, ry + 38 - int(arm_sw)), 6)
+        # Fists / claws
+        claw_l = (rx - 8,          ry + 38 + int(arm_sw))
+        claw_r = (rx + w + 8, ry + 38 - int(arm_sw))
+        for dx2, dy2 in [(-3,-3),(0,-4),(3,-3)]:
+            pygame.draw.line(surf, ORANGE, claw_l, (claw_l[0]+dx2, claw_l[1]+dy2+(-5 if atk_glow else 0)), 2)
+            pygame.draw.line(surf, ORANGE, claw_r, (claw_r[0]-dx2, claw_r[1]+dy2+(-5 if atk_glow else 0)), 2)
+
+        # Head (larger, brutish)
+        pygame.draw.circle(surf, col, (rx + w // 2, ry + 22), head_r)
+        # Bony spikes on head
+        for i, sx2 in enumerate([rx+w//2-14, rx+w//2, rx+w//2+14]):
+            h_spk = 8 + i % 2 * 4
+            pygame.draw.polygon(surf, ORANGE, [(sx2-4, ry+10),(sx2+4, ry+10),(sx2, ry+10-h_spk)])
+        # Eyes — three (creepy)
+        ec = RED if atk_glow else (200, 30, 30)
+        for ex_off in (-8, 0, 8):
+            pygame.draw.circle(surf, ec, (rx + w//2 + ex_off, ry + 20), 3)
+            if atk_glow:
+                glow_circle(surf, RED, rx + w//2 + ex_off, ry + 20, 5, 100)
+            else:
+                glow_circle(surf, ec,  rx + w//2 + ex_off, ry + 20, 3, 40)
+        # Mouth gash
+        pygame.draw.line(surf, (200, 0, 0), (rx + w//2 - 8, ry + 26), (rx + w//2 + 8, ry + 26), 2)
+
+    elif etype == "jefe":
+        r_glow, head_r, enraged = pose[4:]
+        glow_circle(surf, PURPLE, rx+w//2, ry+h//2, r_glow, 70)
+        pygame.draw.rect(surf, col, (rx, ry+32, w, h-32), border_radius=8)
+        pygame.draw.circle(surf, col, (rx+w//2, ry+30), head_r)
+        ec = PINK if enraged else PURPLE
+        for off in (-12, 12):
+            pygame.draw.circle(surf, ec, (rx+w//2+off, ry+26), 6)
+            glow_circle(surf, ec, rx+w//2+off, ry+26, 12, 130)
+        for i in range(4):
+            cy_ = ry + 44 + i*12
+            pygame.draw.line(surf, PURPLE, (rx+8, cy_), (rx+w-8, cy_), 1)
+
+
+_bake_rec = None   # (lienzo, glows) mientras se hornea una pose
+
+def render_enemy_pose(pose):
+    global _bake_rec
+    p = ENEMY_POSE_PAD
+    s = pygame.Surface((pose[1] + 2 * p, pose[2] + 2 * p), pygame.SRCALPHA)
+    glows = []
+    _bake_rec = (s, glows)
+    try:
+        draw_enemy_pose(s, pose, p, p)
+    finally:
+        _bake_rec = None
+    bb = s.get_bounding_rect()
+    return (s.subsurface(bb).copy(), bb.x - p, bb.y - p,
+            [(c, x - p, y - p, r, a) for c, x, y, r, a in glows])
+
+enemy_atlas = PoseAtlas(render_enemy_pose)
+
+def bake_enemy_atlas(enemies):
+    """Hornea el ciclo de animación (normal y herido) de los enemigos del nivel."""
+    poses = []
+    seen = set()
+    for e in enemies:
+        key = (e.etype, e.w, e.h, e.col)
+        if key in seen or e.pose_at(0, e.col, 1, 0, 0) is None:
+            continue
+        seen.add(key)
+        for col in (e.col, RED):
+            for anim_t in range(ANIM_BAKE_FRAMES):
+                for facing in (1, -1):
+                    for speed in (0, e.speed):
+                        poses.append(e.pose_at(anim_t, col, facing, speed, 0))
+        if e.etype == "jefe":
+            phase = e.phase
+            e.phase = 2
+            poses += [e.pose_at(a, c, 1, 0, 0) for a in range(ANIM_BAKE_FRAMES) for c in (e.col, RED)]
+            e.phase = phase
+    return enemy_atlas.bake(poses, ATLAS_BAKE_WORKERS)
 
 
 # ─────────────────────────────────────────────────────────
@@ -1264,10 +1667,17 @@ class Item:
         self.alive = True
         self.bob = random.uniform(0, math.tau)
 
-    def update(self, player):
+    # Caja que cubre todo el recorrido del bob (para el broadphase)
+    BOUNDS = (-13, -18, 26, 36)
+
+    def update(self):
         self.bob += 0.07
-        iy = self.y - math.sin(self.bob) * 5
-        if pygame.Rect(int(self.x)-12, int(iy)-12, 24, 24).colliderect(player.rect):
+
+    def try_pickup(self, player, pr):
+        """pr = player.rect. Misma prueba que un Rect 24×24 centrado, sin crearlo."""
+        ix = int(self.x) - 12
+        iy = int(self.y - math.sin(self.bob) * 5) - 12
+        if ix < pr.right and pr.x < ix + 24 and iy < pr.bottom and pr.y < iy + 24:
             if self.itype == "health":
                 player.hp = min(player.hp + 45, player.max_hp)
                 spawn(self.x, self.y, GREEN, 24, 3, 60, 5)
@@ -1276,22 +1686,45 @@ class Item:
                 spawn(self.x, self.y, CYAN, 24, 3, 60, 5)
             self.alive = False
 
-    def draw(self, surf, ox, oy):
-        sx = int(self.x - ox)
-        sy = int(self.y - math.sin(self.bob)*5 - oy)
+    def _screen_pos(self, ox, oy):
+        return int(self.x - ox), int(self.y - math.sin(self.bob)*5 - oy)
+
+    def draw_glow(self, surf, ox, oy):
+        """Glow detrás del item (capa lights_behind)."""
+        sx, sy = self._screen_pos(ox, oy)
         if -30 < sx < W+30 and -30 < sy < H+30:
             col = GREEN if self.itype == "health" else CYAN
-            glow_buble(surf, col, sx, sy, 32, 60)  # glow detrás
+            glow_buble(surf, col, sx, sy, 32, 60, behind=True)
 
+    def draw(self, surf, ox, oy):
+        sx, sy = self._screen_pos(ox, oy)
+        if -30 < sx < W+30 and -30 < sy < H+30:
             img = ITEM_IMAGES.get(self.itype)
             if img:
                 surf.blit(img, (sx - 26, sy - 26))  # centrada
             else:
                 # fallback al diseño original
-                pygame.draw.rect(surf, col, (sx-9, sy-9, 18, 18), border_radius=4)
-                pygame.draw.rect(surf, WHITE, (sx-9, sy-9, 18, 18), 1, border_radius=4)
-                surf.blit(FNT_XS.render("+HP" if self.itype == "health" else "+AM", True, WHITE),
-                        (sx - 11, sy - 22))
+                spr, dx, dy = _item_fallback_sprite(self.itype)
+                surf.blit(spr, (sx + dx, sy + dy))
+
+
+# Dibujo original del item sin imagen, horneado por tipo: (sprite, dx, dy)
+# respecto al centro del item
+_item_fallbacks = {}
+
+def _item_fallback_sprite(itype):
+    entry = _item_fallbacks.get(itype)
+    if entry is None:
+        col = GREEN if itype == "health" else CYAN
+        label = tc.render(FNT_XS, "+HP" if itype == "health" else "+AM", WHITE)
+        lw, lh = label.get_size()
+        # Caja en (-9, -9, 18, 18) y texto en (-11, -22)
+        s = pygame.Surface((max(lw, 20), max(lh, 31)), pygame.SRCALPHA)
+        pygame.draw.rect(s, col, (2, 13, 18, 18), border_radius=4)
+        pygame.draw.rect(s, WHITE, (2, 13, 18, 18), 1, border_radius=4)
+        s.blit(label, (0, 0))
+        entry = _item_fallbacks[itype] = (s, -11, -22)
+    return entry
 
 
 # ─────────────────────────────────────────────────────────
@@ -1306,7 +1739,11 @@ class Platform:
         ry = self.rect.y - oy
         if rx > W + 80 or rx + self.rect.w < -80:
             return
-        r2 = pygame.Rect(int(rx), int(ry), self.rect.w, self.rect.h)
+        self.render(surf, int(rx), int(ry))
+
+    def render(self, surf, x, y):
+        """Dibuja el tile con su esquina en (x, y); lo usa la caché de chunks."""
+        r2 = pygame.Rect(x, y, self.rect.w, self.rect.h)
         pygame.draw.rect(surf, DARKBLUE, r2, border_radius=3)
         pygame.draw.rect(surf, (0, 55, 80), (r2.x, r2.y, r2.w, 2))
         for gx in range(r2.x, r2.x + r2.w + 28, 28):
@@ -1421,82 +1858,195 @@ def build_level(n):
 # ─────────────────────────────────────────────────────────
 # FONDO PROCEDURAL
 # ─────────────────────────────────────────────────────────
-def draw_bg(surf, cam_x, cam_y, bg_col, level_num, tick):
-    surf.fill(bg_col)
+# Fondo pre-renderizado por nivel: siluetas y scanlines en capas con
+# colorkey que se repiten en horizontal y se desplazan con parallax. Las
+# estrellas son sprites diminutos cacheados por (color, radio); el parpadeo
+# solo cambia qué sprite se usa.
+BG_KEY = (255, 0, 255)
+_bg_layers = {}
+
+def _wrap_draw(draw, x, w):
+    """Dibuja en x y en sus copias desplazadas para que la capa sea repetible."""
+    for dx in (-w, 0, w):
+        draw(x + dx)
+
+def _bake_bg(level_num):
     rng = random.Random(42 + level_num)
-
+    stars = []
     for _ in range(55):
-        sx = (rng.randint(0, W*8) - int(cam_x*0.08)) % W
-        sy = (rng.randint(0, 700) - int(cam_y*0.05)) % H
+        sx = rng.randint(0, W*8) % W
+        sy = rng.randint(0, 700) % H
         sc = (CYAN, PURPLE, PINK)[rng.randrange(3)]
-        pulse = int(70 + 35*math.sin(tick*0.04 + rng.random()*6))
-        r2, g2, b2 = sc
-        pygame.draw.circle(surf,
-                           (r2*pulse//255, g2*pulse//255, b2*pulse//255),
-                           (sx, sy), rng.randint(1, 3))
+        phase = rng.random()*6
+        stars.append((sx, sy, sc, phase, rng.randint(1, 3)))
 
+    # Siluetas del nivel: capa a toda la anchura, recortada a la franja usada
+    far = pygame.Surface((W, H))
+    far.fill(BG_KEY)
+    top = H
     rng2 = random.Random(77 + level_num)
     if level_num == 1:
         for i in range(16):
             bw = rng2.randint(55, 115)
             bh = rng2.randint(80, 340)
-            bx = (rng2.randint(0, 4800) - int(cam_x*0.14)) % W
+            bx = rng2.randint(0, 4800) % W
             by = H - bh
-            pygame.draw.rect(surf, (12, 12, 22), (bx, by, bw, bh))
+            top = min(top, by)
+            wins = []
             for wy2 in range(by+10, by+bh-10, 22):
                 for wx2 in range(bx+7, bx+bw-7, 15):
                     if rng2.random() > 0.45:
                         wc = rng2.choice([(0, 35, 55), (35, 0, 55), (0, 0, 40)])
-                        pygame.draw.rect(surf, wc, (wx2, wy2, 5, 7))
+                        wins.append((wc, wx2 - bx, wy2))
+            def building(x, bw=bw, bh=bh, by=by, wins=wins):
+                pygame.draw.rect(far, (12, 12, 22), (x, by, bw, bh))
+                for wc, wx2, wy2 in wins:
+                    pygame.draw.rect(far, wc, (x + wx2, wy2, 5, 7))
+            _wrap_draw(building, bx, W)
+        speed = 0.14
     elif level_num == 2:
         for _ in range(10):
-            px2 = (rng2.randint(0, 4800) - int(cam_x*0.12)) % W
-            pygame.draw.line(surf, (15, 25, 40), (px2, 0), (px2, H), rng2.randint(2, 5))
+            px2 = rng2.randint(0, 4800) % W
+            lw = rng2.randint(2, 5)
+            _wrap_draw(lambda x, lw=lw: pygame.draw.line(far, (15, 25, 40), (x, 0), (x, H), lw), px2, W)
+        top = 0
+        speed = 0.12
     else:
         for i in range(12):
             tw = rng2.randint(20, 50)
             th = rng2.randint(120, 400)
-            tx2 = (rng2.randint(0, 5200) - int(cam_x*0.12)) % W
+            tx2 = rng2.randint(0, 5200) % W
             ty2 = H - th
-            pygame.draw.rect(surf, (10, 0, 20), (tx2, ty2, tw, th))
-            pygame.draw.line(surf, (180, 0, 255), (tx2+tw//2, ty2), (tx2+tw//2, ty2+th), 1)
-
-    # scanlines
+            top = min(top, ty2)
+            def tower(x, tw=tw, th=th, ty2=ty2):
+                pygame.draw.rect(far, (10, 0, 20), (x, ty2, tw, th))
+                pygame.draw.line(far, (180, 0, 255), (x+tw//2, ty2), (x+tw//2, ty2+th), 1)
+            _wrap_draw(tower, tx2, W)
+        speed = 0.12
+    far = far.subsurface((0, top, W, H - top)).copy()
+
+    # scanlines estáticas y barrido
+    scan = pygame.Surface((W, H))
+    scan.fill(BG_KEY)
     for sy in range(0, H, 4):
-        pygame.draw.line(surf, (0, 0, 0), (0, sy), (W, sy))
+        pygame.draw.line(scan, (0, 0, 0), (0, sy), (W, sy))
+    sweep = pygame.Surface((W, 3), pygame.SRCALPHA)
+    sweep.fill((0, 230, 220, 12))
+
+    if not HEADLESS:
+        far, scan, sweep = far.convert(), scan.convert(), sweep.convert_alpha()
+    far.set_colorkey(BG_KEY, pygame.RLEACCEL)
+    scan.set_colorkey(BG_KEY, pygame.RLEACCEL)
+    return {"stars": stars, "far": far,
+            "far_top": top, "speed": speed, "scan": scan, "sweep": sweep}
+
+_star_sprites = {}
+
+def _star_sprite(col, rad):
+    s = _star_sprites.get((col, rad))
+    if s is None:
+        s = pygame.Surface((2*rad + 1, 2*rad + 1))
+        s.fill(BG_KEY)
+        pygame.draw.circle(s, col, (rad, rad), rad)
+        s.set_colorkey(BG_KEY)
+        _star_sprites[(col, rad)] = s
+    return s
+
+def bg_layers(level_num):
+    key = (level_num, W, H)
+    layers = _bg_layers.get(key)
+    if layers is None:
+        _bg_layers.clear()
+        layers = _bg_layers[key] = _bake_bg(level_num)
+    return layers
+
+def _blit_tiled(surf, layer, ox, y):
+    """Blit de una capa repetible en horizontal desplazada ox módulo su anchura."""
+    lw = layer.get_width()
+    ox %= lw
+    surf.blit(layer, (ox - lw, y))
+    surf.blit(layer, (ox, y))
+
+def draw_bg(surf, cam_x, cam_y, bg_col, level_num, tick):
+    layers = bg_layers(level_num)
+    surf.fill(bg_col)
+
+    ox, oy = int(cam_x*0.08), int(cam_y*0.05)
+    seq = []
+    for sx, sy, (r2, g2, b2), phase, rad in layers["stars"]:
+        pulse = int(70 + 35*math.sin(tick*0.04 + phase))
+        spr = _star_sprite((r2*pulse//255, g2*pulse//255, b2*pulse//255), rad)
+        seq.append((spr, ((sx - ox) % W - rad, (sy - oy) % H - rad)))
+    surf.blits(seq, doreturn=False)
+
+    _blit_tiled(surf, layers["far"], -int(cam_x*layers["speed"]), layers["far_top"])
+
+    surf.blit(layers["scan"], (0, 0))
     scan_y = (tick * 3) % (H + 60) - 30
-    ss = pygame.Surface((W, 3), pygame.SRCALPHA)
-    ss.fill((0, 230, 220, 12))
-    surf.blit(ss, (0, scan_y))
+    surf.blit(layers["sweep"], (0, scan_y))
 
 
 # ─────────────────────────────────────────────────────────
 # HUD
 # ─────────────────────────────────────────────────────────
-def draw_hud(surf, player, zone_name, score, boss):
+# Paneles del HUD cacheados: cada uno se re-renderiza solo cuando cambia la
+# clave con los valores que muestra; un frame normal son unos pocos blits.
+_hud_panels = {}   # nombre -> (clave, superficie)
+
+def _hud_panel(name, key, build):
+    cached = _hud_panels.get(name)
+    if cached is None or cached[0] != key:
+        cached = _hud_panels[name] = (key, build())
+    return cached[1]
+
+def _bar_fill(w, pct):
+    """Ancho en px de la barra que dibuja bar() (clave de dirty-tracking)."""
+    return int(w * clamp(pct, 0, 1))
+
+def _render_stats_panel(player, nc_pct, nc_col):
     ps = pygame.Surface((248, 130), pygame.SRCALPHA)
     pygame.draw.rect(ps, (0, 10, 28, 185), (0, 0, 248, 130), border_radius=8)
     pygame.draw.rect(ps, (*CYAN, 80), (0, 0, 248, 130), 1, border_radius=8)
-    surf.blit(ps, (8, 8))
+    txt(ps, "NEUROCALIPSIS", FNT_XS, CYAN, 8, 4)
+    txt(ps, f"SAKÍ  ──  LVL {player.level}", FNT_SM, WHITE, 8, 20)
+    bar(ps, 8, 46, 180, 15, player.hp/player.max_hp, RED, label=f"HP  {player.hp}/{player.max_hp}")
+    bar(ps, 8, 66, 180, 15, player.ammo/player.max_ammo, CYAN, label=f"AMO {player.ammo}/{player.max_ammo}")
+    bar(ps, 8, 86, 180, 15, player.xp/player.xp_to_next, GOLD, label=f"XP  {player.xp}/{player.xp_to_next}")
+    bar(ps, 8, 106, 180, 15, nc_pct, nc_col, label="DESCARGA NEURAL")
+    return ps
+
+def _render_score(score):
+    st = f"SCORE: {score}"
+    s = pygame.Surface((tc.glyph_width(FNT_SM, st), FNT_SM.get_height()), pygame.SRCALPHA)
+    tc.draw_glyphs(s, FNT_SM, st, GOLD, 0, 0)
+    return s
+
+def _render_boss_panel(boss, bw):
+    bp = pygame.Surface((bw+20, 62), pygame.SRCALPHA)
+    pygame.draw.rect(bp, (10, 0, 22, 200), (0, 0, bw+20, 62), border_radius=8)
+    pygame.draw.rect(bp, (*PURPLE, 90), (0, 0, bw+20, 62), 1, border_radius=8)
+    txt(bp, "LA CONCIENCIA DE LA IA", FNT_SM, PURPLE, 10, 6)
+    pt = tc.render(FNT_XS, f"FASE {boss.phase}", PINK)
+    bp.blit(pt, (10 + bw - pt.get_width(), 6))
+    bar(bp, 10, 28, bw, 20, boss.hp/boss.max_hp, PURPLE, label=f"{boss.hp}/{boss.max_hp}")
+    return bp
 
-    txt(surf, "NEUROCALIPSIS", FNT_XS, CYAN, 16, 12)
-    txt(surf, f"SAKÍ  ──  LVL {player.level}", FNT_SM, WHITE, 16, 28)
-    bar(surf, 16, 54, 180, 15, player.hp/player.max_hp, RED, label=f"HP  {player.hp}/{player.max_hp}")
-    bar(surf, 16, 74, 180, 15, player.ammo/player.max_ammo, CYAN, label=f"AMO {player.ammo}/{player.max_ammo}")
-    bar(surf, 16, 94, 180, 15, player.xp/player.xp_to_next, GOLD, label=f"XP  {player.xp}/{player.xp_to_next}")
+def draw_hud(surf, player, zone_name, score, boss):
     nc_pct = 1 - player.neural_cd/600
     nc_col = PURPLE if nc_pct >= 1 or player.neural_t > 0 else GREY
-    bar(surf, 16, 114, 180, 15, nc_pct, nc_col, label="DESCARGA NEURAL")
+    key = (player.level, player.hp, player.max_hp, player.ammo, player.max_ammo,
+           player.xp, player.xp_to_next, _bar_fill(180, nc_pct), nc_col)
+    surf.blit(_hud_panel("stats", key, lambda: _render_stats_panel(player, nc_pct, nc_col)), (8, 8))
 
     # zona / score
-    zt = FNT_SM.render(zone_name, True, CYAN)
+    zt = tc.render(FNT_SM, zone_name, CYAN)
     surf.blit(zt, (W//2 - zt.get_width()//2, 7))
-    st = FNT_SM.render(f"SCORE: {score}", True, GOLD)
+    st = _hud_panel("score", score, lambda: _render_score(score))
     surf.blit(st, (W - st.get_width() - 12, 7))
 
     # level up
     if player.levelup_t > 0:
-        lt = FNT_BIG.render(f"¡NIVEL {player.level}!", True, GOLD)
+        lt = tc.render(FNT_BIG, f"¡NIVEL {player.level}!", GOLD)
         surf.blit(lt, (W//2 - lt.get_width()//2, H//2 - 50))
         #glow_circle(surf, GOLD, W//2, H//2, 140, 55)
 
@@ -1504,33 +2054,22 @@ def draw_hud(surf, player, zone_name, score, boss):
     if player.combo > 0 and player.combo_t > 0:
         clabels = {1: "SLASH!", 2: "DOBLE SLASH!", 3: "GOLPE FINAL!"}
         ccols = {1: CYAN, 2: PURPLE, 3: GOLD}
-        ct = FNT_MED.render(clabels[player.combo], True, ccols[player.combo])
+        ct = tc.render(FNT_MED, clabels[player.combo], ccols[player.combo])
         surf.blit(ct, (18, H//2))
 
     # boss bar
     if boss and boss.alive:
         bw = 520
-        bx = W//2 - bw//2
-        by = H - 78
-        bp = pygame.Surface((bw+20, 62), pygame.SRCALPHA)
-        pygame.draw.rect(bp, (10, 0, 22, 200), (0, 0, bw+20, 62), border_radius=8)
-        pygame.draw.rect(bp, (*PURPLE, 90), (0, 0, bw+20, 62), 1, border_radius=8)
-        surf.blit(bp, (bx-10, by-6))
-        txt(surf, "LA CONCIENCIA DE LA IA", FNT_SM, PURPLE, bx, by)
-        pt = FNT_XS.render(f"FASE {boss.phase}", True, PINK)
-        surf.blit(pt, (bx + bw - pt.get_width(), by))
-        bar(surf, bx, by+22, bw, 20, boss.hp/boss.max_hp, PURPLE,
-            label=f"{boss.hp}/{boss.max_hp}")
+        key = (boss.hp, boss.max_hp, boss.phase)
+        surf.blit(_hud_panel("boss", key, lambda: _render_boss_panel(boss, bw)),
+                  (W//2 - bw//2 - 10, H - 84))
 
     # aura neural
     if player.neural_t > 0:
-        ns = pygame.Surface((W, H), pygame.SRCALPHA)
-        a = int(90 * player.neural_t / 200)
-        pygame.draw.rect(ns, (*PURPLE, a), (0, 0, W, H), 7)
-        surf.blit(ns, (0, 0))
+        overlay.border(surf, PURPLE, int(90 * player.neural_t / 200), 7)
 
     hint = "[A/D] Mover  [SPACE] Saltar  [J] Katana  [K/Click] Pistola  [L] Descarga  [R] Recargar"
-    ht = FNT_XS.render(hint, True, (80, 100, 130))
+    ht = tc.render(FNT_XS, hint, (80, 100, 130))
     surf.blit(ht, (W//2 - ht.get_width()//2, H - 18))
 
 
@@ -1539,18 +2078,20 @@ def draw_hud(surf, player, zone_name, score, boss):
 # ─────────────────────────────────────────────────────────
 def draw_title(surf, tick):
     surf.fill(BG1)
+    lights.begin(surf)
     for i in range(18):
         ang = i/18 * math.tau + tick*0.012
         px = W//2 + int(math.cos(ang)*360) #Cambios en el radio horizontal
         py = H//2 + int(math.sin(ang)*280) #Cambios en el radio vertical
         glow_circle(surf, (CYAN, PURPLE, PINK)[i % 3], px, py, 20, 40)
+    lights.composite()
 
-    t1 = FNT_BIG.render("NEUROCALIPSIS", True, CYAN)
-    t2 = FNT_MED.render("El Último Fragmento", True, WHITE)
-    t3 = FNT_SM.render("─" * 44, True, GREY)
+    t1 = tc.render(FNT_BIG, "NEUROCALIPSIS", CYAN)
+    t2 = tc.render(FNT_MED, "El Último Fragmento", WHITE)
+    t3 = tc.render(FNT_SM, "─" * 44, GREY)
     blink = (tick // 28) % 2 == 0
-    t4 = FNT_MED.render("Presiona ENTER para comenzar" if blink else "", True, GOLD)
-    t5 = FNT_XS.render("ESC = Salir", True, GREY)
+    t4 = tc.render(FNT_MED, "Presiona ENTER para comenzar" if blink else "", GOLD)
+    t5 = tc.render(FNT_XS, "ESC = Salir", GREY)
 
     y0 = H//2 - 140
     surf.blit(t1, (W//2 - t1.get_width()//2, y0))
@@ -1562,7 +2103,7 @@ def draw_title(surf, tick):
         "Katana, pistola y su Descarga Neural son tu única salvación.",
     ]
     for i, l in enumerate(lines):
-        lt = FNT_SM.render(l, True, (150, 160, 190))
+        lt = tc.render(FNT_SM, l, (150, 160, 190))
         surf.blit(lt, (W//2 - lt.get_width()//2, y0 + 136 + i*28))
     surf.blit(t4, (W//2 - t4.get_width()//2, y0 + 236))
     surf.blit(t5, (W//2 - t5.get_width()//2, y0 + 280))
@@ -1572,34 +2113,42 @@ def draw_title(surf, tick):
 # ─────────────────────────────────────────────────────────
 # MENÚ DE PAUSA
 # ─────────────────────────────────────────────────────────
-def draw_pause_menu(surf):
+# Capas a pantalla completa y paneles estáticos de los overlays
+overlay = OverlayCompositor()
+
+def _render_pause_panel():
     panel = pygame.Surface((360, 320), pygame.SRCALPHA)
-    ov = pygame.Surface((W, H), pygame.SRCALPHA)
     panel.fill((10, 20, 40, 230))
-    ov.fill((0, 0, 0, 160))
-    surf.blit(ov, (0, 0))
-    surf.blit(panel, (W//2 - panel.get_width()//2, H//2 - panel.get_height()//2))
-    pygame.draw.rect(surf, (0, 230, 220), (W//2 - 180, H//2 - 160, 360, 320), 4, border_radius=10)
-    txt(surf, "PAUSA", FNT_BIG, CYAN, W//2 - 120, H//2 - 100)
-    txt(surf, "ESC = Reanudar", FNT_SM, WHITE, W//2 - 90, H//2 - 20)
-    txt(surf, "Q = Salir al título", FNT_SM, WHITE, W//2 - 90, H//2 + 20)
-    txt(surf, "F1 = Debug", FNT_SM, WHITE, W//2 - 90, H//2 + 60)
+    pygame.draw.rect(panel, (0, 230, 220), (0, 0, 360, 320), 4, border_radius=10)
+    txt(panel, "PAUSA", FNT_BIG, CYAN, 60, 60)
+    txt(panel, "ESC = Reanudar", FNT_SM, WHITE, 90, 140)
+    txt(panel, "Q = Salir al título", FNT_SM, WHITE, 90, 180)
+    txt(panel, "F1 = Debug", FNT_SM, WHITE, 90, 220)
+    return panel
 
-def draw_ability_menu(surf, abilities_dict):
-    """Menú de desbloqueos (TAB)."""
-    bx, by = W//2 - 180, H//2 - 160
+def draw_pause_menu(surf):
+    overlay.dim(surf, 160)
+    surf.blit(overlay.panel("pause", None, _render_pause_panel), (W//2 - 180, H//2 - 160))
+
+def _render_ability_panel(abilities_dict):
     panel = pygame.Surface((360, 320), pygame.SRCALPHA)
     panel.fill((10, 20, 40, 230))
-    surf.blit(panel, (bx, by))
-    pygame.draw.rect(surf, CYAN, (bx, by, 360, 320), 2, border_radius=10)
-    txt(surf, "HABILIDADES", FNT_MED, CYAN, bx + 90, by + 12)
-    txt(surf, "TAB = Cerrar", FNT_XS, GREY, bx + 120, by + 48)
-    y = by + 75
+    pygame.draw.rect(panel, CYAN, (0, 0, 360, 320), 2, border_radius=10)
+    txt(panel, "HABILIDADES", FNT_MED, CYAN, 90, 12)
+    txt(panel, "TAB = Cerrar", FNT_XS, GREY, 120, 48)
+    y = 75
     for aid, name in ab.ABILITY_NAMES.items():
         unlocked = abilities_dict.get(aid, False)
         col = GREEN if unlocked else DKGREY
-        txt(surf, ("[OK] " if unlocked else "[--] ") + name, FNT_SM, col, bx + 24, y)
+        txt(panel, ("[OK] " if unlocked else "[--] ") + name, FNT_SM, col, 24, y)
         y += 32
+    return panel
+
+def draw_ability_menu(surf, abilities_dict):
+    """Menú de desbloqueos (TAB)."""
+    key = tuple(bool(abilities_dict.get(aid, False)) for aid in ab.ABILITY_NAMES)
+    surf.blit(overlay.panel("abilities", key, lambda: _render_ability_panel(abilities_dict)),
+              (W//2 - 180, H//2 - 160))
 
 
 # ─────────────────────────────────────────────────────────
@@ -1607,86 +2156,438 @@ def draw_ability_menu(surf, abilities_dict):
 # ─────────────────────────────────────────────────────────
 def draw_debug(surf, player, enemies, ox, oy):
     fps = clock.get_fps()
-    txt(surf, f"FPS: {fps:.0f}", FNT_XS, GREEN, W - 80, 8)
-    pr = player.rect
-    pygame.draw.rect(surf, GREEN, (pr.x - ox, pr.y - oy, pr.w, pr.h), 1)
+    txt(surf, f"FPS: {fps:.0f}", FNT_XS, GREEN, W - 80, 8, glyphs=True)
+    _outline(surf, GREEN, player.rect.move(-ox, -oy))
     for e in enemies:
         if e.alive:
-            er = e.rect
-            pygame.draw.rect(surf, RED, (er.x - ox, er.y - oy, er.w, er.h), 1)
+            _outline(surf, RED, e.rect.move(-ox, -oy))
+
+def _outline(surf, col, r):
+    """Rect de 1 px de borde con fill() (vale también para el canvas SDL2)."""
+    surf.fill(col, (r.x, r.y, r.w, 1))
+    surf.fill(col, (r.x, r.bottom - 1, r.w, 1))
+    surf.fill(col, (r.x, r.y, 1, r.h))
+    surf.fill(col, (r.right - 1, r.y, 1, r.h))
 
 
 # ─────────────────────────────────────────────────────────
 # OVERLAY GAME OVER / WIN
 # ─────────────────────────────────────────────────────────
 def draw_overlay(surf, title, sub, col):
-    ov = pygame.Surface((W, H), pygame.SRCALPHA)
-    pygame.draw.rect(ov, (0, 0, 0, 175), (0, 0, W, H))
-    surf.blit(ov, (0, 0))
+    overlay.dim(surf, 175)
     glow_circle(surf, col, W//2, H//2, 220, 60)
-    t1 = FNT_BIG.render(title, True, col)
-    t2 = FNT_MED.render(sub, True, WHITE)
-    t3 = FNT_SM.render("R = Reiniciar desde checkpoint   ESC = Salir", True, GREY)
+    t1 = tc.render(FNT_BIG, title, col)
+    t2 = tc.render(FNT_MED, sub, WHITE)
+    t3 = tc.render(FNT_SM, "R = Reiniciar desde checkpoint   ESC = Salir", GREY)
     surf.blit(t1, (W//2 - t1.get_width()//2, H//2 - 90))
     surf.blit(t2, (W//2 - t2.get_width()//2, H//2 - 4))
     surf.blit(t3, (W//2 - t3.get_width()//2, H//2 + 62))
 
 
 # ─────────────────────────────────────────────────────────
-# BUCLE PRINCIPAL
+# PARTIDA (estado + lógica, sin dibujo)
 # ─────────────────────────────────────────────────────────
-def run():
-    tick = 0
-    state = "title"
-    score = 0
-    level_n = 1
-
-    tiles, plat_objs, enemies, items, world_w, bg_col, zone_name, checkpoints = build_level(level_n)
-    tile_grid = build_tile_grid(tiles)
-    player = Player(80, 530)
-    ab.check_unlocks(player.level, player.abilities)
-    bullets = []
-    boss = next((e for e in enemies if e.etype == "jefe"), None)
-    last_checkpoint_idx = 0
-    minimap_discovered = set()
-
-    cam_x, cam_y = 0.0, 0.0
-    zone_msg_t = 220
-    fade_in = 255
-
-    def reset_level(n, p, at_checkpoint_idx=None):
-        nonlocal tiles, plat_objs, enemies, items, world_w, bg_col
-        nonlocal zone_name, bullets, boss, zone_msg_t, fade_in, tile_grid, checkpoints, last_checkpoint_idx, minimap_discovered
-        tiles, plat_objs, enemies, items, world_w, bg_col, zone_name, checkpoints = build_level(n)
-        tile_grid = build_tile_grid(tiles)
-        bullets.clear()
+class World:
+    """
+    Nivel cargado, jugador y entidades de una partida.
+    step() avanza un frame de lógica; no toca la pantalla ni el audio
+    (salvo los SND_* del jugador, que son None en modo headless).
+    """
+
+    def __init__(self, level_n=1):
+        self.level_n = level_n
+        self.score = 0
+        self.player = Player(80, 530)
+        ab.check_unlocks(self.player.level, self.player.abilities)
+        self.bullets = BulletPool()
+        # Broadphase: enemigos se reconstruye cada frame, items es incremental
+        self.enemy_grid = SpatialHash()
+        self.item_grid = SpatialHash()
+        self.last_checkpoint_idx = 0
+        self.minimap_discovered = None   # mm.DiscoveryMap del nivel actual
+        self.cam_x, self.cam_y = 0.0, 0.0
+        self._prev = None   # posiciones al empezar el último step (interpolación)
+        self.zone_msg_t = 220
+        self.fade_in = 255
+        self.reset_level(level_n, 0)
+
+    def reset_level(self, n, at_checkpoint_idx=None):
+        p = self.player
+        self.level_n = n
+        (self.tiles, self.plat_objs, self.enemies, self.items, self.world_w,
+         self.bg_col, self.zone_name, self.checkpoints) = build_level(n)
+        self.tile_index = TileIndex(self.tiles)
+        self.sleeping = SpatialHash(SIM_LOD_CELL)   # enemigos dormidos (LOD)
+        for i, e in enumerate(self.enemies):
+            e.lod_i = i
+            self.sleeping.insert(e, e.x, e.y, e.w, e.h)
+        self.awake = []   # enemigos vivos que se simulan, en orden del nivel
+        self.lod_step = 0
+        self._lod_full = None   # región completa (x0, y0, x1, y1), ver _update_lod
+        self.level_chunks = ChunkCache(self.plat_objs, self.tile_index, convert=not HEADLESS)
+        self.item_grid.clear()
+        for it in self.items:
+            self._index_item(it)
+        self.bullets.clear()
         particle_system.clear()
+        effects.clear_damage_numbers()
         if at_checkpoint_idx is not None:
-            last_checkpoint_idx = at_checkpoint_idx
+            self.last_checkpoint_idx = at_checkpoint_idx
         else:
-            last_checkpoint_idx = 0
-            minimap_discovered.clear()
-        cx, cy = checkpoints[last_checkpoint_idx]
+            self.last_checkpoint_idx = 0
+            self.minimap_discovered = None   # nivel nuevo: mapa nuevo
+        cx, cy = self.checkpoints[self.last_checkpoint_idx]
         p.x, p.y = float(cx), float(cy)
+        self._prev = None
+        self._update_lod()
         p.vx = p.vy = 0
         p.dead = False
         p.hp = p.max_hp  # Curar completamente al reiniciar
         p.inv_t = 90
         p.ammo = p.max_ammo  # Recargar munición
-        boss = next((e for e in enemies if e.etype == "jefe"), None)
-        zone_msg_t = 220
-        fade_in = 255
-        minimap_discovered.clear()
-        mm.update_discovered(minimap_discovered, player.x, player.y)
+        self.boss = next((e for e in self.enemies if e.etype == "jefe"), None)
+        self.zone_msg_t = 220
+        self.fade_in = 255
+        # Lo descubierto se conserva al reaparecer en un checkpoint
+        if self.minimap_discovered is None:
+            self.minimap_discovered = mm.DiscoveryMap(self.world_w, MINIMAP_WORLD_H)
+        mm.update_discovered(self.minimap_discovered, p.x, p.y)
+        if not HEADLESS:
+            bg_layers(n)   # hornear el fondo y los enemigos al cargar el nivel
+            bake_enemy_atlas(self.enemies)
+
+    def shoot(self, aim_x, aim_y):
+        self.player.do_shoot(aim_x, aim_y, self.bullets)
+
+    def _index_item(self, it):
+        bx, by, bw, bh = Item.BOUNDS
+        self.item_grid.insert(it, it.x + bx, it.y + by, bw, bh)
+
+    def _reward(self, e, xp):
+        """XP, score y posible drop al matar un enemigo."""
+        self.score += xp
+        self.player.gain_xp(xp)
+        if random.random() < 0.36:
+            tp = "health" if random.random() < 0.5 else "ammo"
+            it = Item(e.x + e.w/2, e.y, tp)
+            self.items.append(it)
+            self._index_item(it)
+
+    def hold(self):
+        """Sin interpolar hasta el próximo step (hitstop: el mundo no avanza)."""
+        self._prev = None
+
+    @contextmanager
+    def interpolated(self, alpha):
+        """
+        Dentro del bloque, cámara, jugador y enemigos están en
+        lerp(anterior, actual, alpha) entre los dos últimos steps; al salir
+        se restauran. Las balas y partículas se dibujan en su posición actual.
+        """
+        prev = self._prev
+        if prev is None or alpha >= 1:
+            yield
+            return
+        p = self.player
+        cam_x, cam_y, px, py, ents = prev
+        cur = (self.cam_x, self.cam_y, p.x, p.y, [(e, e.x, e.y) for e, _, _ in ents])
+        self.cam_x, self.cam_y = lerp(cam_x, self.cam_x, alpha), lerp(cam_y, self.cam_y, alpha)
+        p.x, p.y = lerp(px, p.x, alpha), lerp(py, p.y, alpha)
+        for e, ex, ey in ents:
+            e.x, e.y = lerp(ex, e.x, alpha), lerp(ey, e.y, alpha)
+        try:
+            yield
+        finally:
+            self.cam_x, self.cam_y, p.x, p.y, ents = cur
+            for e, ex, ey in ents:
+                e.x, e.y = ex, ey
+
+    def _lod_region(self, half_w, half_h, slack):
+        """(x0, y0, x1, y1): jugador ± half_w/half_h unido a la vista ± slack."""
+        p = self.player
+        return (min(p.cx - half_w, self.cam_x - slack),
+                min(p.cy - half_h, self.cam_y - slack),
+                max(p.cx + half_w, self.cam_x + W + slack),
+                max(p.cy + half_h, self.cam_y + H + slack))
+
+    def _update_lod(self):
+        """
+        Despierta los enemigos dormidos que entran en la región activa,
+        duerme los que salen de ella + SIM_SLEEP_SLACK y fija la región
+        completa del próximo paso. Solo depende de la posición del jugador y
+        de la cámara, así que es determinista.
+        """
+        self._lod_full = self._lod_region(SIM_FULL_HALF_W, SIM_FULL_HALF_H, SIM_SLEEP_SLACK)
+        x0, y0, x1, y1 = self._lod_region(SIM_ACTIVE_HALF_W, SIM_ACTIVE_HALF_H,
+                                          2 * SIM_SLEEP_SLACK)
+        awake, sleeping = self.awake, self.sleeping
+        woke = False
+        for e in sleeping.query(x0, y0, x1 - x0, y1 - y0):
+            if x0 <= e.cx <= x1 and y0 <= e.cy <= y1:
+                sleeping.remove(e)
+                awake.append(e)
+                woke = True
+        if woke:
+            awake.sort(key=lambda e: e.lod_i)
+        x0 -= SIM_SLEEP_SLACK; x1 += SIM_SLEEP_SLACK
+        y0 -= SIM_SLEEP_SLACK; y1 += SIM_SLEEP_SLACK
+        keep = []
+        for e in awake:
+            if not e.alive:
+                continue
+            if x0 <= e.cx <= x1 and y0 <= e.cy <= y1:
+                keep.append(e)
+            else:
+                sleeping.insert(e, e.x, e.y, e.w, e.h)
+        self.awake = keep
+
+    def lod_violations(self):
+        """
+        Enemigos vivos que solapan la vista y no se simulan a ritmo completo
+        (dormidos o fuera de la región completa). Debe estar siempre vacía;
+        la comprueba simulate().
+        """
+        awake = set(map(id, self.awake))
+        fx0, fy0, fx1, fy1 = self._lod_full
+        view = pygame.Rect(int(self.cam_x), int(self.cam_y), W, H)
+        return [e for e in self.enemies
+                if e.alive and view.colliderect(e.rect)
+                and (id(e) not in awake or not (fx0 <= e.cx <= fx1 and fy0 <= e.cy <= fy1))]
+
+    def step(self, keys, aim_x, aim_y):
+        """Un frame de simulación. Devuelve el nuevo estado: "playing", "dead" o "win"."""
+        player, bullets = self.player, self.bullets
+        state = "playing"
+        self._prev = (self.cam_x, self.cam_y, player.x, player.y,
+                      [(e, e.x, e.y) for e in self.awake])
+
+        # temporizadores de presentación (mensaje de zona, fundido de entrada):
+        # van por pasos de simulación, no por frames dibujados
+        if self.zone_msg_t > 0:
+            self.zone_msg_t -= 1
+        self.fade_in = max(0, self.fade_in - 9)
+
+        # disparar pistola con K (continuo)
+        if keys[pygame.K_k]:
+            self.shoot(aim_x, aim_y)
+
+        player.update(keys, self.tile_index)
+
+        # LOD: solo los enemigos despiertos entran en la broadphase y se
+        # actualizan (despertados al final del paso anterior)
+        enemies = self.awake
+
+        # broadphase de enemigos (posiciones del frame anterior, como antes)
+        grid = self.enemy_grid
+        grid.clear()
+        for e in enemies:
+            grid.insert(e, e.x, e.y, e.w, e.h)
+
+        # balas: movimiento, límites del mundo y tiles en una pasada por lotes
+        for i in bullets.update(self.tile_index, self.world_w):
+            spawn(float(bullets.x[i]), float(bullets.y[i]), tuple(bullets.col[i].tolist()), 5, 2, 12, 3)
+        for i in bullets.live(OWNER_PLAYER):
+            bx, by = float(bullets.x[i]), float(bullets.y[i])
+            # las balas pueden alcanzar también a enemigos dormidos (lejanos)
+            for e in grid.query_point(bx, by) + self.sleeping.query_point(bx, by):
+                if e.alive and e.rect.collidepoint(bx, by):
+                    dmg = int(bullets.dmg[i])
+                    xp = e.take_damage(dmg)
+                    effects.trigger_hitstop(frames=2, is_slash=False)
+                    effects.trigger_shake(is_slash=False)
+                    effects.spawn_damage_number(e.cx, e.cy - 20, dmg, (0, 230, 220), e)
+                    if xp:
+                        self.sleeping.remove(e)
+                        self._reward(e, xp)
+                    bullets.alive[i] = False
+                    break
+        for i in bullets.hits_rect(OWNER_ENEMY, player.rect):
+            player.take_damage(int(bullets.dmg[i]))
+            bullets.alive[i] = False
+        bullets.compact()
+
+        # katana vs enemigos + hit feedback
+        for se in player.slash_effects:
+            sr = se.rect
+            for e in grid.query_rect(sr):
+                if e.alive and id(e) not in se.hit_ids:
+                    if sr.colliderect(e.rect):
+                        xp = e.take_damage(se.dmg)
+                        se.hit_ids.add(id(e))
+                        effects.trigger_hitstop()
+                        effects.trigger_shake(is_slash=True)
+                        effects.spawn_damage_number(e.cx, e.cy - 20, se.dmg, (0, 230, 220), e)
+                        if xp:
+                            self._reward(e, xp)
+
+        # enemigos
+        # fuera de la región completa, a 1/SIM_LOD_STRIDE (ningún enemigo
+        # puede tener al jugador dentro de su aggro_r ahí)
+        self.lod_step += 1
+        fx0, fy0, fx1, fy1 = self._lod_full
+        lod_step = self.lod_step
+        update_enemies([e for e in enemies
+                        if e.alive and ((fx0 <= e.cx <= fx1 and fy0 <= e.cy <= fy1)
+                                        or (e.lod_i + lod_step) % SIM_LOD_STRIDE == 0)],
+                       player, self.tile_index, bullets)
+
+        # items
+        for it in self.items:
+            it.update()
+        pr = player.rect
+        picked = False
+        for it in self.item_grid.query_rect(pr):
+            it.try_pickup(player, pr)
+            if not it.alive:
+                self.item_grid.remove(it)
+                picked = True
+        if picked:
+            self.items = [it for it in self.items if it.alive]
+
+        update_particles()
+
+        mm.update_discovered(self.minimap_discovered, player.x, player.y)
+
+        # checkpoints: activar si el jugador pasa por uno
+        for i, (cx, cy) in enumerate(self.checkpoints):
+            if abs(player.cx - cx) < 100 and abs(player.cy - cy) < 80:
+                if i > self.last_checkpoint_idx:
+                    self.last_checkpoint_idx = i
+                    # Feedback visual al activar checkpoint
+                    spawn(cx, cy, GOLD, 15, 3, 30, 5)
+
+        # cámara (shake se aplica al dibujar)
+        self.cam_x = lerp(self.cam_x, player.cx - W/2, 0.10)
+        self.cam_y = lerp(self.cam_y, player.cy - H/2 + 70, 0.10)
+        self.cam_x = clamp(self.cam_x, 0, self.world_w - W)
+        self.cam_y = clamp(self.cam_y, 0, 800)
+
+        # LOD con la cámara ya movida: lo que se dibuje este frame está despierto
+        self._update_lod()
+
+        if player.dead:
+            state = "dead"
+
+        # avance de zona
+        boss = self.boss
+        if boss and not boss.alive and player.x > self.world_w - 400:
+            if self.level_n < 3:
+                player.hp = min(player.hp + 55, player.max_hp)
+                player.ammo = player.max_ammo
+                self.reset_level(self.level_n + 1)
+            else:
+                state = "win"
+
+        return state
+
+
+# ─────────────────────────────────────────────────────────
+# DIBUJO DE LA PARTIDA
+# ─────────────────────────────────────────────────────────
+def _render_zone_msg(zone_name):
+    """Caja y texto del mensaje de zona (alpha global se aplica al dibujar)."""
+    zt = FNT_MED.render(zone_name, True, CYAN)
+    zs = pygame.Surface((zt.get_width()+24, zt.get_height()+12))
+    zs.fill((255, 0, 255))
+    zs.set_colorkey((255, 0, 255))
+    pygame.draw.rect(zs, (0, 0, 0), zs.get_rect(), border_radius=7)
+    return zs, zt
+
+def _draw_offset(world):
+    shake_dx, shake_dy = effects.get_camera_offset()
+    return int(world.cam_x) + int(shake_dx), int(world.cam_y) + int(shake_dy)
+
+def draw_scene(surf, world, state, tick):
+    """Mundo, HUD y minimapa: todo menos los overlays de estado."""
+    player = world.player
+    draw_ox, draw_oy = _draw_offset(world)
+
+    draw_bg(surf, draw_ox, draw_oy, world.bg_col, world.level_n, tick)
+
+    world.level_chunks.draw(surf, draw_ox, draw_oy)
+
+    # glows detrás de los sprites, compuestos antes de las entidades
+    lights_behind.begin(surf)
+    for it in world.items:
+        it.draw_glow(surf, draw_ox, draw_oy)
+    if state != "dead":
+        player.draw_aura(surf, draw_ox, draw_oy)
+    lights_behind.composite()
+
+    lights.begin(surf)
+    for it in world.items:
+        it.draw(surf, draw_ox, draw_oy)
+    for e in world.awake:   # los dormidos están fuera de pantalla
+        if e.alive:
+            e.draw(surf, draw_ox, draw_oy)
+    draw_bullets(surf, world.bullets, draw_ox, draw_oy)
+    draw_particles(surf, draw_ox, draw_oy)
+    if state != "dead":
+        player.draw(surf, draw_ox, draw_oy)
+    effects.draw_damage_numbers(surf, draw_ox, draw_oy)
+    lights.composite()
+
+    # mensaje de zona
+    if world.zone_msg_t > 0:
+        a = min(255, world.zone_msg_t * 3)
+        zs, zt = overlay.panel("zone", world.zone_name, lambda: _render_zone_msg(world.zone_name))
+        overlay.blit(surf, zs, (W//2 - zs.get_width()//2, 60), min(200, a))
+        overlay.blit(surf, zt, (W//2 - zt.get_width()//2, 66), a)
+
+    boss = world.boss
+    draw_hud(surf, player, world.zone_name, world.score,
+             boss if boss and boss.alive else None)
+    mm.draw_minimap(surf, world.minimap_discovered, player.x, player.y, W - 200, H - 118)
+
+    if player.show_ability_menu:
+        draw_ability_menu(surf, player.abilities)
+
+def draw_world(surf, world, state, tick, frozen=None):
+    """
+    frozen: captura de draw_scene() tomada al entrar en pausa/muerte/victoria;
+    si se pasa, el mundo no se vuelve a dibujar y solo se componen encima
+    los overlays.
+    """
+    player = world.player
+    if frozen is None:
+        draw_scene(surf, world, state, tick)
+    else:
+        surf.blit(frozen, (0, 0))
+
+    if state == "dead":
+        draw_overlay(surf, "GAME OVER",
+                     f"Has caído...  Checkpoint alcanzado: {world.last_checkpoint_idx+1}", RED)
+    elif state == "win":
+        draw_overlay(surf, "¡VICTORIA!",
+                     f"La IA fue derrotada  ·  Score: {world.score}  ·  Nivel: {player.level}", GOLD)
+    elif state == "pause":
+        draw_pause_menu(surf)
+
+    if DEBUG:
+        draw_debug(surf, player, world.enemies, *_draw_offset(world))
+
+    # fade in
+    if world.fade_in > 0:
+        overlay.dim(surf, world.fade_in)
+
+
+# ─────────────────────────────────────────────────────────
+# BUCLE PRINCIPAL
+# ─────────────────────────────────────────────────────────
+def run():
+    global DEBUG
+    tick = 0
+    elapsed = 0     # ms de pantalla; tick = elapsed en frames de 60 Hz
+    acc = 0.0       # ms pendientes de simular
+    max_fps = get_settings().get("max_fps", FPS)
+    state = "title"
+    world = World(1)
+    frozen = None   # captura del mundo en los estados congelados
 
     def restart_game():
         """Reinicia el juego completamente desde el principio"""
-        nonlocal level_n, score, player, bullets, enemies, items, boss, last_checkpoint_idx
-        level_n = 1
-        score = 0
-        player = Player(80, 530)
-        ab.check_unlocks(player.level, player.abilities)
-        reset_level(level_n, player, 0)
+        nonlocal world
+        world = World(1)
         # Reproducir música de fondo en loop infinito
         try:
             pygame.mixer.music.play(-1)  # -1 significa loop infinito
@@ -1695,17 +2596,24 @@ def run():
             print("⚠️ No se pudo reproducir la música de fondo")
 
     while True:
-        dt = clock.tick(FPS)
-        tick += 1
-        effects.update_effects()
+        # Pantallas quietas a menos FPS; el juego a max_fps (0 = sin límite)
+        fps = TITLE_FPS if state == "title" else IDLE_FPS if state in FROZEN_STATES else max_fps
+        dt = clock.tick(fps)
+        elapsed += dt
+        tick = elapsed * FPS // 1000
+        if state != "playing":
+            effects.update_effects()
         keys = pygame.key.get_pressed()
-        mx, my = pygame.mouse.get_pos()
-        world_mx = mx + int(cam_x)
-        world_my = my + int(cam_y)
+        mx, my = mouse_pos()
+        world_mx = mx + int(world.cam_x)
+        world_my = my + int(world.cam_y)
+        player = world.player
 
             # ── EVENTOS ───────────────────────────────────────
         for event in pygame.event.get():
-            if event.type == pygame.QUIT:
+            # WINDOWCLOSE: con el backend SDL2 queda abierta la ventana oculta
+            # de pygame.display y cerrar la del juego no genera QUIT
+            if event.type in (pygame.QUIT, pygame.WINDOWCLOSE):
                 pygame.quit()
                 sys.exit()
 
@@ -1724,8 +2632,8 @@ def run():
                         sys.exit()
                         
                 if event.key == pygame.K_F1 and state in ("playing", "pause"):
-                    global DEBUG
                     DEBUG = not DEBUG
+                    frozen = None
 
                 if state == "pause" and event.key == pygame.K_q:
                     state = "title"
@@ -1735,6 +2643,7 @@ def run():
                 if state == "title" and event.key in (pygame.K_RETURN, pygame.K_KP_ENTER):
                     state = "playing"
                     restart_game()
+                    player = world.player
 
                     # La música se inicia dentro de restart_game()
 
@@ -1742,7 +2651,7 @@ def run():
                     if state == "dead":
                         state = "playing"
                         # Reiniciar desde el último checkpoint
-                        reset_level(level_n, player, last_checkpoint_idx)
+                        world.reset_level(world.level_n, world.last_checkpoint_idx)
                         # Asegurar que la música siga sonando
                         try:
                             pygame.mixer.music.unpause()
@@ -1751,6 +2660,7 @@ def run():
                     elif state == "win":
                         state = "playing"
                         restart_game()
+                        player = world.player
                     elif state == "playing":
                         player.ammo = player.max_ammo
                         # Reproducir sonido de recarga
@@ -1767,171 +2677,168 @@ def run():
                         player.show_ability_menu = not player.show_ability_menu
 
             if state == "playing" and event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                b = player.do_shoot(world_mx, world_my)
-                if b:
-                    bullets.append(b)
+                world.shoot(world_mx, world_my)
 
         # ── UPDATE ────────────────────────────────────────
-        if state == "playing" and not effects.is_hitstop_active():
-            # disparar pistola con K (continuo)
-            if keys[pygame.K_k]:
-                b = player.do_shoot(world_mx, world_my)
-                if b:
-                    bullets.append(b)
-
-            player.update(keys, tiles)
-
-            # balas (colisión con grid)
-            for b in bullets[:]:
-                b.update(tile_grid)
-                if not b.alive:
-                    bullets.remove(b)
-                    continue
-                if b.owner == "player":
-                    for e in enemies:
-                        if e.alive and e.rect.collidepoint(b.x, b.y):
-                            xp = e.take_damage(b.dmg)
-                            effects.trigger_hitstop(frames=2, is_slash=False)
-                            effects.trigger_shake(is_slash=False)
-                            effects.spawn_damage_number(e.cx, e.cy - 20, b.dmg, (0, 230, 220))
-                            if xp:
-                                score += xp
-                                player.gain_xp(xp)
-                                if random.random() < 0.36:
-                                    tp = "health" if random.random() < 0.5 else "ammo"
-                                    items.append(Item(e.x + e.w/2, e.y, tp))
-                            b.alive = False
-                            break
-                elif b.owner == "enemy":
-                    if player.rect.collidepoint(b.x, b.y):
-                        player.take_damage(b.dmg)
-                        b.alive = False
-
-            # katana vs enemigos + hit feedback
-            for se in player.slash_effects:
-                for e in enemies:
-                    if e.alive and id(e) not in se.hit_ids:
-                        if se.rect.colliderect(e.rect):
-                            xp = e.take_damage(se.dmg)
-                            se.hit_ids.add(id(e))
-                            effects.trigger_hitstop()
-                            effects.trigger_shake(is_slash=True)
-                            effects.spawn_damage_number(e.cx, e.cy - 20, se.dmg, (0, 230, 220))
-                            if xp:
-                                score += xp
-                                player.gain_xp(xp)
-                                if random.random() < 0.36:
-                                    tp = "health" if random.random() < 0.5 else "ammo"
-                                    items.append(Item(e.x + e.w/2, e.y, tp))
-
-            # enemigos
-            for e in enemies:
-                if e.alive:
-                    e.update(player, tiles, bullets)
-
-            # items
-            for it in items[:]:
-                it.update(player)
-                if not it.alive:
-                    items.remove(it)
-
-            update_particles()
-
-            mm.update_discovered(minimap_discovered, player.x, player.y)
-
-            # checkpoints: activar si el jugador pasa por uno
-            for i, (cx, cy) in enumerate(checkpoints):
-                if abs(player.cx - cx) < 100 and abs(player.cy - cy) < 80:
-                    if i > last_checkpoint_idx:
-                        last_checkpoint_idx = i
-                        # Feedback visual al activar checkpoint
-                        spawn(cx, cy, GOLD, 15, 3, 30, 5)
-
-            # cámara (shake se aplica al dibujar)
-            cam_x = lerp(cam_x, player.cx - W/2, 0.10)
-            cam_y = lerp(cam_y, player.cy - H/2 + 70, 0.10)
-            cam_x = clamp(cam_x, 0, world_w - W)
-            cam_y = clamp(cam_y, 0, 800)
-
-            if player.dead:
-                state = "dead"
-
-            # avance de zona
-            if boss and not boss.alive and player.x > world_w - 400:
-                if level_n < 3:
-                    level_n += 1
-                    player.hp = min(player.hp + 55, player.max_hp)
-                    player.ammo = player.max_ammo
-                    reset_level(level_n, player)
-                    boss = next((e for e in enemies if e.etype == "jefe"), None)
+        # Paso fijo de STEP_MS: los pasos que quepan en el tiempo acumulado,
+        # como mucho MAX_SIM_STEPS; el resto se interpola al dibujar
+        if state == "playing":
+            acc += dt
+            steps = 0
+            while acc >= STEP_MS and steps < MAX_SIM_STEPS and state == "playing":
+                effects.update_effects()
+                if effects.is_hitstop_active():
+                    world.hold()
                 else:
-                    state = "win"
+                    state = world.step(keys, world_mx, world_my)
+                acc -= STEP_MS
+                steps += 1
+            if steps == MAX_SIM_STEPS or state != "playing":
+                acc = min(acc, STEP_MS)
+        else:
+            acc = 0.0
 
         # ── DIBUJAR ───────────────────────────────────────
-        shake_dx, shake_dy = effects.get_camera_offset()
-        draw_ox = int(cam_x) + int(shake_dx)
-        draw_oy = int(cam_y) + int(shake_dy)
-
         if state == "title":
+            frozen = None
             draw_title(screen, tick)
+        elif state in FROZEN_STATES:
+            if frozen is None:
+                frozen = screen.copy()
+                draw_scene(frozen, world, state, tick)
+            draw_world(screen, world, state, tick, frozen)
         else:
-            draw_bg(screen, draw_ox, draw_oy, bg_col, level_n, tick)
-
-            for p in plat_objs:
-                p.draw(screen, draw_ox, draw_oy)
-            for it in items:
-                it.draw(screen, draw_ox, draw_oy)
-            for e in enemies:
-                if e.alive:
-                    e.draw(screen, draw_ox, draw_oy)
-            for b in bullets:
-                b.draw(screen, draw_ox, draw_oy)
-            draw_particles(screen, draw_ox, draw_oy)
-            if state != "dead":
-                player.draw(screen, draw_ox, draw_oy)
-            effects.draw_damage_numbers(screen, draw_ox, draw_oy)
-
-            # mensaje de zona
-            if zone_msg_t > 0:
-                a = min(255, zone_msg_t * 3)
-                zt = FNT_MED.render(zone_name, True, CYAN)
-                zs = pygame.Surface((zt.get_width()+24, zt.get_height()+12), pygame.SRCALPHA)
-                pygame.draw.rect(zs, (0, 0, 0, min(200, a)), zs.get_rect(), border_radius=7)
-                screen.blit(zs, (W//2 - zs.get_width()//2, 60))
-                zt.set_alpha(a)
-                screen.blit(zt, (W//2 - zt.get_width()//2, 66))
-                zone_msg_t -= 1
-
-            draw_hud(screen, player, zone_name, score,
-                     boss if boss and boss.alive else None)
-            mm.draw_minimap(screen, minimap_discovered, player.x, player.y, world_w, 800, W - 200, H - 118)
-
-            if player.show_ability_menu:
-                draw_ability_menu(screen, player.abilities)
-
-            if state == "dead":
-                draw_overlay(screen, "GAME OVER",
-                             f"Has caído...  Checkpoint alcanzado: {last_checkpoint_idx+1}", RED)
-            elif state == "win":
-                draw_overlay(screen, "¡VICTORIA!",
-                             f"La IA fue derrotada  ·  Score: {score}  ·  Nivel: {player.level}", GOLD)
-            elif state == "pause":
-                draw_pause_menu(screen)
-
-            if DEBUG:
-                draw_debug(screen, player, enemies, draw_ox, draw_oy)
-
-            # fade in
-            if fade_in > 0:
-                fs = pygame.Surface((W, H))
-                fs.fill((0, 0, 0))
-                fs.set_alpha(fade_in)
-                screen.blit(fs, (0, 0))
-                fade_in = max(0, fade_in - 9)
-
-        pygame.display.flip()
+            frozen = None
+            with world.interpolated(acc / STEP_MS):
+                draw_world(screen, world, state, tick)
+
+        present()
+
+
+# ─────────────────────────────────────────────────────────
+# SIMULACIÓN SIN PANTALLA (benchmarks, soak tests)
+# ─────────────────────────────────────────────────────────
+class ScriptedKeys:
+    """Sustituto de pygame.key.get_pressed(): teclas mantenidas en un set."""
+
+    def __init__(self):
+        self.held = set()
+
+    def __getitem__(self, key):
+        return key in self.held
+
+
+class Autopilot:
+    """
+    Entrada determinista para la simulación: avanza a la derecha saltando,
+    ataca al enemigo más cercano y, si se atasca contra una pared, retrocede
+    un tramo (cada vez más largo) para volver a intentarlo.
+    """
+
+    def __init__(self):
+        self.keys = ScriptedKeys()
+        self.best_x = 0.0
+        self.stuck_t = 0
+        self.back_t = 0
+        self.tries = 0
+
+    def __call__(self, world, frame):
+        """Prepara self.keys para este frame y devuelve el punto de mira (x, y)."""
+        p = world.player
+        if p.x > self.best_x + 4:
+            self.best_x, self.stuck_t = p.x, 0
+        else:
+            self.stuck_t += 1
+        if self.stuck_t > 90 and self.back_t <= 0:
+            self.tries += 1
+            self.back_t, self.stuck_t = 15 + (self.tries * 23) % 70, 0
+
+        if self.back_t > 0:
+            self.back_t -= 1
+            self.keys.held = {pygame.K_a}
+        else:
+            self.keys.held = {pygame.K_d}
+            period = (1, 9, 17, 31)[self.tries % 4]
+            if frame % period == 0:
+                self.keys.held.add(pygame.K_SPACE)
+            if ab.has_ability(p.abilities, ab.ABILITY_DASH) and frame % 90 == 0:
+                self.keys.held.add(pygame.K_LSHIFT)
+
+        target, best = None, 420.0
+        for e in world.enemies:
+            if e.alive:
+                d = abs(e.cx - p.cx) + abs(e.cy - p.cy)
+                if d < best:
+                    target, best = e, d
+        if target is None:
+            return p.cx + p.facing * 200, p.cy
+
+        self.keys.held.add(pygame.K_k)
+        if abs(target.cx - p.cx) < 80:
+            p.do_slash()
+        if p.ammo <= 0:
+            p.ammo = p.max_ammo  # equivalente a pulsar R
+        if p.neural_cd <= 0 and target.etype in ("mutante", "jefe"):
+            p.do_neural()
+        return target.cx, target.cy
+
+
+def simulate(level_n=1, frames=10000, seed=None, check_lod=False):
+    """
+    Corre el bucle de juego sin ventana ni límite de FPS, con entrada del
+    autopiloto. Requiere init(headless=True). Devuelve un dict de estadísticas.
+    check_lod=True comprueba en cada paso que ningún enemigo visible esté
+    dormido o a ritmo reducido (AssertionError si lo está).
+    """
+    if seed is not None:
+        random.seed(seed)
+        particle_system.seed(seed)
+    world = World(level_n)
+    pilot = Autopilot()
+    state = "playing"
+    deaths = wins = 0
+    peak_bullets = peak_particles = 0
+
+    t0 = time.perf_counter()
+    for frame in range(frames):
+        effects.update_effects()
+        if state == "dead":
+            deaths += 1
+            world.reset_level(world.level_n, world.last_checkpoint_idx)
+            state = "playing"
+        elif state == "win":
+            wins += 1
+            world = World(level_n)
+            pilot = Autopilot()
+            state = "playing"
+        if effects.is_hitstop_active():
+            continue
+        aim_x, aim_y = pilot(world, frame)
+        state = world.step(pilot.keys, aim_x, aim_y)
+        if check_lod:
+            bad = world.lod_violations()
+            assert not bad, (f"frame {frame}: enemigos visibles sin simular a ritmo completo: "
+                             f"{[(e.etype, int(e.x), int(e.y)) for e in bad]}")
+        peak_bullets = max(peak_bullets, len(world.bullets))
+        peak_particles = max(peak_particles, len(particle_system))
+    elapsed = time.perf_counter() - t0
+
+    return {
+        "frames": frames,
+        "seconds": elapsed,
+        "fps": frames / elapsed if elapsed > 0 else float("inf"),
+        "level": world.level_n,
+        "score": world.score,
+        "player_level": world.player.level,
+        "deaths": deaths,
+        "wins": wins,
+        "enemies_alive": sum(1 for e in world.enemies if e.alive),
+        "peak_bullets": peak_bullets,
+        "peak_particles": peak_particles,
+    }
 
 
 # ─────────────────────────────────────────────────────────
 if __name__ == "__main__":
-    run()
\ No newline at end of file
+    init()
+    run()
@@ -1,9 +1,16 @@
 """
 Minimapa con celdas descubiertas y posición del jugador.
 El mundo se discretiza en celdas (ej. 400x300 px). Al entrar en una celda se marca como descubierta.
+
+Las celdas descubiertas de un nivel se guardan en un DiscoveryMap (grid de
+bits sobre un bytearray) que sobrevive a los respawns en checkpoint. El
+minimapa se dibuja en una superficie propia: solo se pintan las celdas
+nuevas, y se redibuja entero al cambiar de nivel (otro DiscoveryMap). Las
+celdas nuevas se pintan en una copia, nunca sobre la superficie ya
+dibujada: el backend SDL2 cachea una textura por superficie.
 """
 import pygame
-from typing import Set, Tuple
+from typing import Iterator, Tuple
 
 # Tamaño de celda en mundo (px)
 CELL_W = 400
@@ -13,6 +20,8 @@ CELL_H = 300
 MINIMAP_W = 180
 MINIMAP_H = 100
 
+_KEY = (255, 0, 255)
+
 
 def world_to_cell(x: float, y: float) -> Tuple[int, int]:
     cx = int(x) // CELL_W
@@ -20,18 +29,125 @@ def world_to_cell(x: float, y: float) -> Tuple[int, int]:
     return (cx, cy)
 
 
-def update_discovered(discovered: Set[Tuple[int, int]], player_x: float, player_y: float) -> None:
-    """Añade la celda actual del jugador a descubiertas."""
-    discovered.add(world_to_cell(player_x, player_y))
+class DiscoveryMap:
+    """
+    Celdas descubiertas de un nivel de world_w x world_h px, un bit por
+    celda. Las celdas fuera del nivel se ignoran (el minimapa no las
+    muestra). `log` guarda las celdas en el orden en que se descubrieron.
+    """
+    __slots__ = ("world_w", "world_h", "cells_x", "cells_y", "bits", "log")
+
+    def __init__(self, world_w: int, world_h: int):
+        self.world_w = world_w
+        self.world_h = world_h
+        self.cells_x = max(1, (world_w + CELL_W - 1) // CELL_W)
+        self.cells_y = max(1, (world_h + CELL_H - 1) // CELL_H)
+        self.bits = bytearray((self.cells_x * self.cells_y + 7) // 8)
+        self.log = []
+
+    def __len__(self):
+        return len(self.log)
+
+    def __contains__(self, cell: Tuple[int, int]) -> bool:
+        cx, cy = cell
+        if not (0 <= cx < self.cells_x and 0 <= cy < self.cells_y):
+            return False
+        i = cy * self.cells_x + cx
+        return bool(self.bits[i >> 3] & (1 << (i & 7)))
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        return iter(self.log)
+
+    def mark(self, cx: int, cy: int) -> bool:
+        """Marca la celda; True si es nueva."""
+        if not (0 <= cx < self.cells_x and 0 <= cy < self.cells_y):
+            return False
+        i = cy * self.cells_x + cx
+        m = 1 << (i & 7)
+        if self.bits[i >> 3] & m:
+            return False
+        self.bits[i >> 3] |= m
+        self.log.append((cx, cy))
+        return True
+
+    def clear(self) -> None:
+        self.bits = bytearray(len(self.bits))
+        self.log = []
+
+
+def update_discovered(discovered: DiscoveryMap, player_x: float, player_y: float) -> bool:
+    """Marca la celda actual del jugador como descubierta; True si es nueva."""
+    return discovered.mark(*world_to_cell(player_x, player_y))
+
+
+class Minimap:
+    """Superficie del minimapa, actualizada de forma incremental."""
+
+    def __init__(self):
+        self._surf = None
+        self._key = None     # (DiscoveryMap, colores, tamaño) del último redibujado
+        self._log = None     # lista de celdas ya pintadas (la del DiscoveryMap)
+        self._drawn = 0
+
+    def _cell_rect(self, disc, cx, cy):
+        cell_screen_w = MINIMAP_W / disc.cells_x
+        cell_screen_h = MINIMAP_H / disc.cells_y
+        sx = cx * cell_screen_w
+        sy = cy * cell_screen_h
+        return (sx + 1, sy + 1, max(1, cell_screen_w - 1), max(1, cell_screen_h - 1))
+
+    def _refresh(self, disc, border_col, bg_col, discovered_col):
+        key = (disc, border_col, bg_col, discovered_col, MINIMAP_W, MINIMAP_H)
+        fresh = key != self._key or disc.log is not self._log
+        if fresh:
+            # Redibujado completo: nivel nuevo, otros colores o tamaño
+            s = pygame.Surface((MINIMAP_W, MINIMAP_H))
+            s.fill(_KEY)
+            s.set_colorkey(_KEY)
+            pygame.draw.rect(s, bg_col, (0, 0, MINIMAP_W, MINIMAP_H), border_radius=4)
+            pygame.draw.rect(s, border_col, (0, 0, MINIMAP_W, MINIMAP_H), 1, border_radius=4)
+            self._surf, self._key, self._log, self._drawn = s, key, disc.log, 0
+        new = disc.log[self._drawn:]
+        if new:
+            if not fresh:
+                self._surf = self._surf.copy()
+            for cx, cy in new:
+                pygame.draw.rect(self._surf, discovered_col,
+                                 self._cell_rect(disc, cx, cy), border_radius=1)
+            self._drawn = len(disc.log)
+        return self._surf
+
+    @staticmethod
+    def _dot(player_col):
+        dot = _dots.get(player_col)
+        if dot is None:
+            dot = _dots[player_col] = pygame.Surface((9, 9), pygame.SRCALPHA)
+            pygame.draw.circle(dot, player_col, (4, 4), 4)
+            pygame.draw.circle(dot, (255, 255, 255), (4, 4), 2)
+        return dot
+
+    def draw(self, surf, disc, player_x, player_y, x, y,
+             border_col=(0, 230, 220), bg_col=(10, 20, 40),
+             discovered_col=(0, 80, 100), player_col=(255, 55, 55)):
+        surf.blit(self._refresh(disc, border_col, bg_col, discovered_col), (x, y))
+
+        # Jugador
+        pcx, pcy = world_to_cell(player_x, player_y)
+        if 0 <= pcx < disc.cells_x and 0 <= pcy < disc.cells_y:
+            px = x + (pcx + 0.5) * MINIMAP_W / disc.cells_x
+            py = y + (pcy + 0.5) * MINIMAP_H / disc.cells_y
+            surf.blit(self._dot(player_col), (int(px) - 4, int(py) - 4))
+
+
+_dots = {}   # color del jugador -> sprite del punto
+_minimap = Minimap()
 
 
 def draw_minimap(
     surf: pygame.Surface,
-    discovered: Set[Tuple[int, int]],
+    discovered: DiscoveryMap,
     player_x: float,
     player_y: float,
-    world_w: int,
-    world_h: int,
     x: int,
     y: int,
     border_col=(0, 230, 220),
@@ -41,33 +157,7 @@ def draw_minimap(
 ) -> None:
     """
     Dibuja el minimapa en (x, y) con ancho MINIMAP_W y alto MINIMAP_H.
-    world_h puede ser 800 o el alto máximo del nivel.
+    El tamaño del mundo es el del DiscoveryMap.
     """
-    cells_x = max(1, (world_w + CELL_W - 1) // CELL_W)
-    cells_y = max(1, (world_h + CELL_H - 1) // CELL_H)
-    cell_screen_w = MINIMAP_W / cells_x
-    cell_screen_h = MINIMAP_H / cells_y
-
-    # Fondo
-    pygame.draw.rect(surf, bg_col, (x, y, MINIMAP_W, MINIMAP_H), border_radius=4)
-    pygame.draw.rect(surf, border_col, (x, y, MINIMAP_W, MINIMAP_H), 1, border_radius=4)
-
-    # Celdas descubiertas
-    for (cx, cy) in discovered:
-        if 0 <= cx < cells_x and 0 <= cy < cells_y:
-            sx = x + cx * cell_screen_w
-            sy = y + cy * cell_screen_h
-            pygame.draw.rect(
-                surf,
-                discovered_col,
-                (sx + 1, sy + 1, max(1, cell_screen_w - 1), max(1, cell_screen_h - 1)),
-                border_radius=1,
-            )
-
-    # Jugador
-    pcx, pcy = world_to_cell(player_x, player_y)
-    if 0 <= pcx < cells_x and 0 <= pcy < cells_y:
-        px = x + (pcx + 0.5) * cell_screen_w
-        py = y + (pcy + 0.5) * cell_screen_h
-        pygame.draw.circle(surf, player_col, (int(px), int(py)), 4)
-        pygame.draw.circle(surf, (255, 255, 255), (int(px), int(py)), 2)
+    _minimap.draw(surf, discovered, player_x, player_y, x, y,
+                  border_col, bg_col, discovered_col, player_col)
@@ -0,0 +1,45 @@
+"""
+Punto de entrada por línea de comandos.
+
+  python -m neurocalipsis                                   → juego normal
+  python -m neurocalipsis simulate --level 1 --frames 100000 → simulación
+      sin ventana ni audio, a máxima velocidad de CPU (benchmarks / soak tests)
+"""
+import argparse
+
+import main as game
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="neurocalipsis")
+    sub = parser.add_subparsers(dest="cmd")
+    sim = sub.add_parser("simulate", help="Simular el bucle de juego sin pantalla")
+    sim.add_argument("--level", type=int, default=1, choices=(1, 2, 3))
+    sim.add_argument("--frames", type=int, default=10000)
+    sim.add_argument("--seed", type=int, default=None,
+                     help="Semilla de random para una corrida reproducible")
+    sim.add_argument("--check-lod", action="store_true",
+                     help="Comprobar en cada paso que los enemigos visibles se simulan")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = _parse_args(argv)
+    if args.cmd == "simulate":
+        game.init(headless=True)
+        stats = game.simulate(args.level, args.frames, seed=args.seed,
+                                check_lod=args.check_lod)
+        print(f"frames={stats['frames']}  tiempo={stats['seconds']:.2f}s  "
+              f"fps={stats['fps']:.0f}")
+        for k in ("level", "score", "player_level", "deaths", "wins",
+                  "enemies_alive", "peak_bullets", "peak_particles"):
+            print(f"  {k}: {stats[k]}")
+        return 0
+
+    game.init()
+    game.run()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
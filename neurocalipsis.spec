@@ -30,7 +30,16 @@ a = Analysis(
         "minimap",
         "drone_sprites",
         "level_loader",
+        "collision",
+        "bullets",
+        "lighting",
+        "chunks",
+        "atlas",
+        "text_cache",
+        "overlays",
+        "sdl2_render",
         "data.load_stats",
+        "data.load_settings",
     ] + pygame_hiddenimports,
     hookspath=[],
     hooksconfig={},
@@ -0,0 +1,70 @@
+"""
+Compositor de overlays en espacio de pantalla (fundidos, pausa, game over,
+aura, mensaje de zona).
+
+Las capas a pantalla completa se reservan una vez por tamaño de pantalla y
+se modulan con set_alpha() en cada frame; los paneles estáticos se cachean
+por nombre y se re-renderizan solo cuando cambia su clave. En el bucle de
+frames no se crea ninguna superficie a resolución completa.
+"""
+import pygame
+
+
+class OverlayCompositor:
+    def __init__(self):
+        self._size = None
+        self._black = None
+        self._borders = {}   # (color, ancho) -> tiras (superior, inferior, izq., der.)
+        self._panels = {}    # nombre -> (clave, superficie)
+
+    def _ensure(self, size):
+        if size != self._size:
+            self._black = pygame.Surface(size)
+            if pygame.display.get_surface() is not None:
+                self._black = self._black.convert()
+            self._black.fill((0, 0, 0))
+            self._borders.clear()
+            self._size = size
+
+    def dim(self, surf, alpha):
+        """Oscurece toda la pantalla (negro con alpha 0-255)."""
+        if alpha <= 0:
+            return
+        self._ensure(surf.get_size())
+        self._black.set_alpha(alpha)
+        surf.blit(self._black, (0, 0))
+
+    def border(self, surf, color, alpha, width):
+        """Marco de `width` px en el borde de la pantalla (como draw.rect con grosor)."""
+        if alpha <= 0:
+            return
+        w, h = surf.get_size()
+        self._ensure((w, h))
+        key = (tuple(color), width)
+        strips = self._borders.get(key)
+        if strips is None:
+            strips = []
+            for sw, sh, pos in ((w, width, (0, 0)), (w, width, (0, h - width)),
+                                (width, h - 2 * width, (0, width)),
+                                (width, h - 2 * width, (w - width, width))):
+                s = pygame.Surface((sw, max(0, sh)))
+                s.fill(color)
+                strips.append((s, pos))
+            self._borders[key] = strips
+        for s, pos in strips:
+            s.set_alpha(alpha)
+            surf.blit(s, pos)
+
+    def panel(self, name, key, build):
+        """Panel cacheado: build() solo se llama si cambia `key`."""
+        cached = self._panels.get(name)
+        if cached is None or cached[0] != key:
+            cached = self._panels[name] = (key, build())
+        return cached[1]
+
+    def blit(self, surf, panel, pos, alpha=255):
+        """Blit de un panel del compositor con alpha global 0-255."""
+        if alpha <= 0:
+            return
+        panel.set_alpha(min(alpha, 255))
+        surf.blit(panel, pos)
@@ -1,62 +1,126 @@
 """
 Sistema de partículas encapsulado (sustituye _PARTS global).
+Structure-of-arrays en NumPy: integración, amortiguación, envejecimiento y
+compactación se hacen por lotes. Capacidad fija; al llenarse se descartan
+primero las partículas más viejas.
+Dibujo: sprites de círculo pre-renderizados (cuantizados por radio y nivel
+de desvanecimiento, cacheados por color) enviados en un solo blits().
 """
 import pygame
 import math
-import random
+import numpy as np
 
+GRAVITY = 0.13
+DAMPING = 0.93
+DEFAULT_CAPACITY = 4096
 
-class Particle:
-    __slots__ = ("x", "y", "vx", "vy", "col", "life", "ml", "sz")
+# Niveles de desvanecimiento del sprite (el color se oscurece con la vida)
+FADE_LEVELS = 16
+# Tope de sprites en caché antes de vaciarla (colores × radios × niveles)
+SPRITE_CACHE_MAX = 2048
 
-    def __init__(self, x, y, vx, vy, col, life, sz):
-        self.x, self.y, self.vx, self.vy = x, y, vx, vy
-        self.col, self.life, self.ml, self.sz = col, life, life, sz
+_sprites = {}
 
-    def update(self):
-        self.x += self.vx
-        self.y += self.vy
-        self.vy += 0.13
-        self.vx *= 0.93
-        self.life -= 1
 
-    def draw(self, surf, ox, oy, W, H):
-        if self.life <= 0:
-            return
-        ratio = self.life / self.ml
-        sz = max(1, int(self.sz * ratio))
-        sx, sy = int(self.x - ox), int(self.y - oy)
-        if -16 < sx < W + 16 and -16 < sy < H + 16:
-            rc, gc, bc = self.col
-            pygame.draw.circle(
-                surf,
-                (int(rc * ratio), int(gc * ratio), int(bc * ratio)),
-                (sx, sy),
-                sz,
-            )
+def _circle_sprite(key):
+    """key = (rgb empaquetado << 16) | (radio << 8) | nivel. Crea y cachea el sprite."""
+    if len(_sprites) >= SPRITE_CACHE_MAX:
+        _sprites.clear()
+    packed, r, q = key >> 16, (key >> 8) & 0xFF, key & 0xFF
+    k = q / FADE_LEVELS
+    col = (int((packed >> 16) * k), int(((packed >> 8) & 0xFF) * k), int((packed & 0xFF) * k))
+    s = pygame.Surface((2 * r + 1, 2 * r + 1), pygame.SRCALPHA)
+    pygame.draw.circle(s, col, (r, r), r)
+    _sprites[key] = s
+    return s
 
 
 class ParticleSystem:
-    def __init__(self):
-        self._parts = []
+    def __init__(self, capacity=DEFAULT_CAPACITY, seed=None):
+        self.capacity = capacity
+        self.n = 0   # vivas en [0, n), de la más vieja a la más nueva
+        self.x    = np.zeros(capacity, dtype=np.float64)
+        self.y    = np.zeros(capacity, dtype=np.float64)
+        self.vx   = np.zeros(capacity, dtype=np.float64)
+        self.vy   = np.zeros(capacity, dtype=np.float64)
+        self.col  = np.zeros((capacity, 3), dtype=np.uint8)
+        self.life = np.zeros(capacity, dtype=np.int32)
+        self.ml   = np.ones(capacity, dtype=np.int32)
+        self.sz   = np.zeros(capacity, dtype=np.float64)
+        self._rng = np.random.default_rng(seed)
+
+    def _arrays(self):
+        return (self.x, self.y, self.vx, self.vy, self.col, self.life, self.ml, self.sz)
+
+    def seed(self, seed):
+        """Reinicia el generador aleatorio (simulaciones reproducibles)."""
+        self._rng = np.random.default_rng(seed)
 
     def spawn(self, x, y, col, n=8, sp=3, life=28, sz=4):
-        for _ in range(n):
-            ang = random.uniform(0, math.tau)
-            s = random.uniform(sp * 0.3, sp)
-            self._parts.append(
-                Particle(x, y, math.cos(ang) * s, math.sin(ang) * s, col, life, sz)
-            )
+        n = min(n, self.capacity)
+        if n <= 0 or life <= 0:
+            return
+        # Desalojar las más viejas si no hay sitio
+        drop = self.n + n - self.capacity
+        if drop > 0:
+            keep = self.n - drop
+            for arr in self._arrays():
+                arr[:keep] = arr[drop:self.n]
+            self.n = keep
+        i, j = self.n, self.n + n
+        ang = self._rng.uniform(0, math.tau, n)
+        s = self._rng.uniform(sp * 0.3, sp, n)
+        self.x[i:j] = x
+        self.y[i:j] = y
+        self.vx[i:j] = np.cos(ang) * s
+        self.vy[i:j] = np.sin(ang) * s
+        self.col[i:j] = col
+        self.life[i:j] = life
+        self.ml[i:j] = life
+        self.sz[i:j] = sz
+        self.n = j
 
     def update(self):
-        for i in range(len(self._parts) - 1, -1, -1):
-            self._parts[i].update()
-            if self._parts[i].life <= 0:
-                self._parts.pop(i)
+        n = self.n
+        if n == 0:
+            return
+        self.x[:n] += self.vx[:n]
+        self.y[:n] += self.vy[:n]
+        self.vy[:n] += GRAVITY
+        self.vx[:n] *= DAMPING
+        self.life[:n] -= 1
+        alive = self.life[:n] > 0
+        m = int(np.count_nonzero(alive))
+        if m < n:
+            for arr in self._arrays():
+                arr[:m] = arr[:n][alive]
+            self.n = m
 
     def draw(self, surf, ox, oy, W, H):
-        for p in self._parts:
-            p.draw(surf, ox, oy, W, H)
+        n = self.n
+        if n == 0:
+            return
+        sx = (self.x[:n] - ox).astype(np.int64)
+        sy = (self.y[:n] - oy).astype(np.int64)
+        vis = np.flatnonzero((-16 < sx) & (sx < W + 16) & (-16 < sy) & (sy < H + 16))
+        if len(vis) == 0:
+            return
+        ratio = self.life[vis] / self.ml[vis]
+        r = np.minimum(255, np.maximum(1, (self.sz[vis] * ratio).astype(np.int64)))
+        q = np.ceil(ratio * FADE_LEVELS).astype(np.int64)
+        c = self.col[vis].astype(np.int64)
+        keys = ((((c[:, 0] << 16) | (c[:, 1] << 8) | c[:, 2]) << 16) | (r << 8) | q).tolist()
+        px = (sx[vis] - r).tolist()
+        py = (sy[vis] - r).tolist()
+        cache = _sprites
+        seq = [(cache.get(k) or _circle_sprite(k), (x, y)) for k, x, y in zip(keys, px, py)]
+        if hasattr(surf, "fblits"):   # pygame-ce
+            surf.fblits(seq)
+        else:
+            surf.blits(seq, doreturn=False)
 
     def clear(self):
-        self._parts.clear()
+        self.n = 0
+
+    def __len__(self):
+        return self.n
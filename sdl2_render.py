@@ -0,0 +1,266 @@
+"""
+Backend de dibujo SDL2 (pygame._sdl2.video): Window + Renderer + Texture.
+
+Con "render_backend": "sdl2" el frame no se compone en una Surface:
+`screen` es un RendererCanvas, un destino con la parte de la API de Surface
+que usa el dibujo del juego (fill, blit, blits, fblits, copy). Cada
+superficie que se dibuja en él (frames del jugador y del drone, items,
+poses del atlas de enemigos, chunks del nivel, glows, texto y paneles) se
+sube una vez a una Texture; después cada blit es una copia del Renderer.
+SDL aplica el alpha por píxel, el alpha de superficie (set_alpha) y el
+volteo horizontal (mirror()); los blits aditivos (BLEND_RGB_ADD, glows y
+mapa de luz) usan Texture.blend_mode en modo ADD.
+
+Las texturas se cachean por superficie con referencias débiles: cuando la
+superficie sale de su caché (LRU de chunks, de poses, de texto...) la
+textura se libera con ella. Una superficie ya dibujada no debe modificarse
+en el sitio (salvo set_alpha): quien la cambia dibuja en una copia, ver
+minimap.py. pygame.draw no acepta un RendererCanvas, así que el dibujo del
+frame se hace con sprites cacheados.
+
+El frame se dibuja en una textura de destino del tamaño de
+render_resolution (o de la ventana) y present() la escala a la ventana con
+bandas negras. Si no hay driver acelerado se usa el "software" de SDL, que
+funciona en cualquier máquina (CI, VIDEODRIVER dummy).
+
+pygame sigue necesitando un modo de vídeo para convert()/convert_alpha():
+init() abre una ventana oculta de 1x1 con display.set_mode() antes de
+crear SDL2Backend.
+"""
+import os
+import weakref
+import pygame
+
+try:
+    from pygame._sdl2 import video
+except ImportError:   # pygame sin _sdl2 (builds antiguos o recortados)
+    video = None
+
+# Nombre del filtro en settings.json -> valor de SDL_RENDER_SCALE_QUALITY
+SCALE_QUALITY = {"nearest": "nearest", "smooth": "linear"}
+
+# SDL_BlendMode
+BLENDMODE_NONE  = 0
+BLENDMODE_BLEND = 1
+BLENDMODE_ADD   = 2
+
+ADD_FLAGS = (pygame.BLEND_RGB_ADD, pygame.BLEND_RGBA_ADD)
+
+# Superficie volteada -> original: se dibuja con la textura de la original
+_mirrors = weakref.WeakKeyDictionary()
+
+
+def available():
+    return video is not None
+
+
+def mirror(flipped, source):
+    """Registra `flipped` como el volteo horizontal de `source`; la devuelve."""
+    _mirrors[flipped] = source
+    return flipped
+
+
+class SDL2Backend:
+    def __init__(self, title, frame_size=None, fullscreen=True, filt="smooth"):
+        """
+        frame_size: tamaño del frame (None = el de la ventana).
+        filt: "nearest" o "smooth" para el escalado frame -> ventana.
+        Lanza pygame.error si SDL no puede crear la ventana o el renderer.
+        """
+        if video is None:
+            raise pygame.error("pygame._sdl2.video no disponible")
+        # _sdl2 lanza su propio error (RuntimeError); se traduce a pygame.error
+        try:
+            if fullscreen:
+                self.window = video.Window(title, fullscreen_desktop=True)
+            else:
+                self.window = video.Window(title, frame_size or (1280, 720))
+        except video.error as e:
+            raise pygame.error(str(e))
+        try:
+            self.renderer = video.Renderer(self.window, accelerated=1)
+            self.accelerated = True
+        except video.error:
+            try:
+                self.renderer = video.Renderer(self.window, accelerated=0)
+            except video.error as e:
+                self.window.destroy()
+                raise pygame.error(str(e))
+            self.accelerated = False
+        self.frame_size = tuple(frame_size or self.window.size)
+        self._bound = None     # RendererCanvas que es ahora el target del renderer
+        self._textures = weakref.WeakKeyDictionary()   # Surface -> [Texture, alpha, blend]
+        self._additive = weakref.WeakKeyDictionary()   # Surface -> Texture (modo ADD)
+        # El hint se lee al crear cada textura: el filtro elegido para el
+        # frame y "linear" para el resto (las luces se dibujan escaladas)
+        os.environ["SDL_RENDER_SCALE_QUALITY"] = SCALE_QUALITY.get(filt, "linear")
+        try:
+            self.screen = RendererCanvas(self, self.frame_size)
+        except video.error as e:
+            self.window.destroy()
+            raise pygame.error(str(e))
+        os.environ["SDL_RENDER_SCALE_QUALITY"] = "linear"
+        self.dest = None
+        self._layout()
+
+    def _layout(self):
+        """Rect de la ventana donde va el frame: escalado uniforme y centrado."""
+        ww, wh = self.window.size
+        fw, fh = self.frame_size
+        k = min(ww / fw, wh / fh)
+        sw, sh = round(fw * k), round(fh * k)
+        self.dest = pygame.Rect((ww - sw) // 2, (wh - sh) // 2, sw, sh)
+        self._win_size = (ww, wh)
+
+    @property
+    def size(self):
+        return self.window.size
+
+    # ── Texturas ──────────────────────────────────────────
+    def _entry(self, surf):
+        entry = self._textures.get(surf)
+        if entry is None:
+            tex = video.Texture.from_surface(self.renderer, surf)
+            keyed = surf.get_flags() & pygame.SRCALPHA or surf.get_colorkey() is not None
+            tex.alpha = 255
+            tex.blend_mode = BLENDMODE_BLEND if keyed else BLENDMODE_NONE
+            entry = self._textures[surf] = [tex, 255, tex.blend_mode, keyed]
+        return entry
+
+    def _additive_texture(self, surf):
+        tex = self._additive.get(surf)
+        if tex is None:
+            # Como BLEND_RGB_ADD en software: se suma el RGB sin ponderar por
+            # el alpha del píxel, así que la textura se sube sin canal alpha
+            tex = video.Texture.from_surface(self.renderer, surf.convert())
+            tex.blend_mode = BLENDMODE_ADD
+            self._additive[surf] = tex
+        return tex
+
+    def draw(self, src, dest, area=None, special_flags=0, size=None):
+        """
+        Copia `src` (Surface o RendererCanvas) al target actual en `dest`;
+        area: rect de origen (como en Surface.blit); size: escala el
+        resultado a ese tamaño.
+        """
+        flip = False
+        if isinstance(src, RendererCanvas):
+            tex = src.texture
+        elif special_flags:
+            if special_flags not in ADD_FLAGS:
+                raise ValueError(f"special_flags no soportado por el backend SDL2: {special_flags}")
+            tex = self._additive_texture(src)
+            alpha = src.get_alpha()
+            tex.alpha = 255 if alpha is None else alpha
+        else:
+            source = _mirrors.get(src)
+            if source is not None:
+                src, flip = source, True
+            entry = self._entry(src)
+            tex = entry[0]
+            alpha = src.get_alpha()
+            alpha = 255 if alpha is None else alpha
+            if alpha != entry[1]:
+                tex.alpha = entry[1] = alpha
+            blend = BLENDMODE_BLEND if alpha < 255 or entry[3] else BLENDMODE_NONE
+            if blend != entry[2]:
+                tex.blend_mode = entry[2] = blend
+
+        x, y = dest[0], dest[1]
+        if area is not None:
+            area = pygame.Rect(area)
+            if flip:
+                area.x = tex.width - area.right
+            w, h = size or area.size
+            tex.draw(srcrect=area, dstrect=(x, y, w, h), flip_x=flip)
+        elif size is not None:
+            tex.draw(dstrect=(x, y, size[0], size[1]), flip_x=flip)
+        else:
+            tex.draw(dstrect=(x, y), flip_x=flip)
+
+    # ── Frame ─────────────────────────────────────────────
+    def present(self):
+        """Escala el frame (screen) a la ventana y lo presenta."""
+        if self.window.size != self._win_size:
+            self._layout()
+        r = self.renderer
+        r.target = None
+        self._bound = None
+        r.draw_color = (0, 0, 0, 255)
+        r.clear()
+        self.screen.texture.draw(dstrect=self.dest)
+        r.present()
+
+    def close(self):
+        self._textures.clear()
+        self._additive.clear()
+        self.window.destroy()
+
+
+class RendererCanvas:
+    """
+    Destino de dibujo sobre una textura target del Renderer, con la parte
+    de la API de Surface que usa el juego. blits()/fblits() no devuelven
+    rects.
+    """
+
+    def __init__(self, backend, size):
+        self.backend = backend
+        self.texture = video.Texture(backend.renderer, size, target=True)
+        self._size = (int(size[0]), int(size[1]))
+
+    def _bind(self):
+        b = self.backend
+        if b._bound is not self:
+            b.renderer.target = self.texture
+            b._bound = self
+        return b
+
+    def get_size(self):
+        return self._size
+
+    def get_width(self):
+        return self._size[0]
+
+    def get_height(self):
+        return self._size[1]
+
+    def get_rect(self, **kw):
+        r = pygame.Rect((0, 0), self._size)
+        for k, v in kw.items():
+            setattr(r, k, v)
+        return r
+
+    def fill(self, color, rect=None):
+        r = self._bind().renderer
+        color = pygame.Color(color)
+        r.draw_color = (color.r, color.g, color.b, 255)
+        if rect is None:
+            r.clear()
+        else:
+            r.fill_rect(pygame.Rect(rect))
+
+    def blit(self, source, dest, area=None, special_flags=0):
+        self._bind().draw(source, dest, area, special_flags)
+
+    def blit_scaled(self, source, rect, special_flags=0):
+        """Blit de `source` estirado a `rect` (lo escala el renderer)."""
+        rect = pygame.Rect(rect)
+        self._bind().draw(source, rect.topleft, None, special_flags, rect.size)
+
+    def blits(self, blit_sequence, doreturn=True):
+        draw = self._bind().draw
+        for item in blit_sequence:
+            draw(*item)
+
+    def fblits(self, blit_sequence):
+        draw = self._bind().draw
+        for src, dest in blit_sequence:
+            draw(src, dest)
+
+    def copy(self):
+        """Canvas nuevo con el contenido actual de este."""
+        c = RendererCanvas(self.backend, self._size)
+        c._bind()
+        self.texture.draw()
+        return c
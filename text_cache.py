@@ -0,0 +1,77 @@
+"""
+Caché de texto renderizado.
+
+render(): superficie de font.render(text, True, color) cacheada por
+(fuente, texto, color) en una LRU acotada. La sombra de txt() es el mismo
+texto en negro, así que ocupa su propia entrada.
+
+Para cadenas que cambian casi cada frame (HP, munición, score, FPS...) la
+LRU solo se llenaría de basura: draw_glyphs() compone el texto carácter a
+carácter desde un atlas de glifos por (fuente, color), que se rellena una
+sola vez por carácter. Pensado para fuentes monoespaciadas (consolas); en
+fuentes proporcionales se pierde el kerning.
+"""
+from collections import OrderedDict
+
+TEXT_CACHE_MAX = 512
+
+_texts = OrderedDict()
+_glyphs = {}   # (fuente, color) -> {carácter: superficie}
+_advances = {}  # (fuente, carácter) -> ancho
+
+
+def render(font, text, color):
+    key = (font, text, tuple(color))
+    s = _texts.get(key)
+    if s is not None:
+        _texts.move_to_end(key)
+        return s
+    s = _texts[key] = font.render(text, True, color)
+    if len(_texts) > TEXT_CACHE_MAX:
+        _texts.popitem(last=False)
+    return s
+
+
+def _atlas(font, color):
+    key = (font, tuple(color))
+    atlas = _glyphs.get(key)
+    if atlas is None:
+        atlas = _glyphs[key] = {}
+    return atlas
+
+
+def _glyph(atlas, font, ch, color):
+    g = atlas.get(ch)
+    if g is None:
+        g = atlas[ch] = font.render(ch, True, color)
+    return g
+
+
+def glyph_width(font, text):
+    """Ancho en px de draw_glyphs() para `text` (sin dibujar)."""
+    w = 0
+    for ch in text:
+        a = _advances.get((font, ch))
+        if a is None:
+            a = _advances[(font, ch)] = font.size(ch)[0]
+        w += a
+    return w
+
+
+def draw_glyphs(surf, font, text, color, x, y):
+    """Dibuja `text` en (x, y) glifo a glifo en un solo blits(). Devuelve el ancho."""
+    atlas = _atlas(font, color)
+    seq = []
+    x0 = x
+    for ch in text:
+        g = _glyph(atlas, font, ch, color)
+        seq.append((g, (x, y)))
+        x += g.get_width()
+    surf.blits(seq, doreturn=False)
+    return x - x0
+
+
+def clear():
+    _texts.clear()
+    _glyphs.clear()
+    _advances.clear()